@@ -0,0 +1,172 @@
+import os
+import re
+import tarfile
+import threading
+import zipfile
+from collections import namedtuple
+
+# Sources of the "X_Y/data_Z.txt" files of the dataset: a folder (DirectorySource) or the compressed archive of the dataset as
+# downloaded (ArchiveSource, zip or tar/tar.gz), whose members are read directly from the archive without extracting them to disk.
+# Both sources list the "X_Y" folders and their files in the same way, so the scripts traverse the boards, algorithms and iterations
+# of an archive exactly as those of a folder. The files of an archive are identified by ArchiveMember tuples instead of paths, which
+# the functions of RawParser read from the archive.
+
+# Pattern of the "X_Y/data_Z.txt" members of an archive (in any parent folder of the archive)
+member_pattern = r'(?:^|/)(\d+_\d+)/(data_\d+\.txt)$'
+
+# Extensions of the supported archives
+archive_extensions = (".zip", ".tar", ".tar.gz", ".tgz")
+
+# Size of the blocks in which the members are decompressed.
+read_block_bytes = 64 * 1024
+
+# File of an archive, given by the path of the archive and the name of the member
+class ArchiveMember(namedtuple("ArchiveMember", ["archive_path", "name"])):
+
+    def __str__(self):
+        return f"{self.archive_path}!{self.name}"
+
+
+# Function to check whether a path is an archive of the dataset (instead of a folder)
+def is_archive(path):
+    return path.lower().endswith(archive_extensions)
+
+
+# Function to check whether an archive is a single compressed stream (a compressed tar archive), whose members can only be reached
+# by decompressing the archive from its beginning
+def is_stream_archive(path):
+    return is_archive(path) and not path.lower().endswith((".zip", ".tar")) and not zipfile.is_zipfile(path)
+
+
+# Function to get the number of worker processes used to read the given files. The members of a compressed tar archive are read
+# by the main process only (1 worker), as each worker process would decompress the whole archive again to index it and to reach
+# its members, which is slower than a single serial read of the archive.
+def reading_workers(file_paths, workers):
+    if workers > 1:
+        stream_archives = {file_path.archive_path for file_path in file_paths
+                           if isinstance(file_path, ArchiveMember) and is_stream_archive(file_path.archive_path)}
+        if stream_archives:
+            print(f"Warning: the files of the compressed tar archives {', '.join(sorted(stream_archives))} are read serially instead of by "
+                  f"{workers} worker processes (zip archives can be read in parallel).")
+            return 1
+    return workers
+
+
+# Source of the files of a folder
+class DirectorySource:
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    # Function to list the files of an "X_Y" folder (or the folders of the source if "folder" is None)
+    def listdir(self, folder=None):
+        return os.listdir(self.directory if folder is None else os.path.join(self.directory, folder))
+
+    # Function to check whether an "X_Y" folder exists
+    def exists(self, folder):
+        return os.path.exists(os.path.join(self.directory, folder))
+
+    # Function to get the path of a file of an "X_Y" folder
+    def path(self, folder, file_name):
+        return os.path.join(self.directory, folder, file_name)
+
+
+# Source of the files of a zip or tar archive. The members of a zip archive are compressed independently, so they are decompressed
+# in parallel by the threads or processes that read them. A tar.gz archive is a single compressed stream: it is indexed with a full
+# pass when it is opened, and its members are decompressed one at a time, faster when they are read in the order they are stored.
+class ArchiveSource:
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        if zipfile.is_zipfile(archive_path):
+            self.archive = zipfile.ZipFile(archive_path)
+            names = self.archive.namelist()
+        else:
+            self.archive = tarfile.open(archive_path, "r:*")
+            names = [member.name for member in self.archive.getmembers() if member.isfile()]
+
+        # Members of each "X_Y" folder, by file name
+        self.folders = {}
+        for name in names:
+            match = re.search(member_pattern, name.replace("\\", "/"))
+            if match:
+                self.folders.setdefault(match.group(1), {})[match.group(2)] = name
+
+    def listdir(self, folder=None):
+        return list(self.folders if folder is None else self.folders.get(folder, {}))
+
+    def exists(self, folder):
+        return folder in self.folders
+
+    def path(self, folder, file_name):
+        return ArchiveMember(self.archive_path, self.folders[folder][file_name])
+
+    # Function to get the uncompressed size of a member
+    def member_size(self, name):
+        if isinstance(self.archive, zipfile.ZipFile):
+            return self.archive.getinfo(name).file_size
+        return self.archive.getmember(name).size
+
+    # Function to read the beginning of a member, up to its first "max_lines" lines (the whole member if None).
+    # The member is decompressed block by block, so the rest of it is not decompressed.
+    def read(self, name, max_lines=None):
+        if isinstance(self.archive, zipfile.ZipFile):
+            # Each reader of a zip archive has its own decompressor, so the members are decompressed in parallel.
+            with self.archive.open(name) as member_file:
+                return read_lines(member_file, max_lines)
+        # The members of a tar archive share the stream of the archive.
+        with self.lock:
+            with self.archive.extractfile(name) as member_file:
+                return read_lines(member_file, max_lines)
+
+
+# Function to read a file object up to its first "max_lines" lines (or to its end if None)
+def read_lines(opened_file, max_lines):
+    blocks = []
+    found_lines = 0
+    while True:
+        block = opened_file.read(read_block_bytes)
+        if not block:
+            break
+        blocks.append(block)
+        if max_lines is not None:
+            found_lines += block.count(b"\n")
+            if found_lines >= max_lines:
+                break
+    return b"".join(blocks)
+
+
+# Archives opened by this process, shared by all the reads of their members
+open_archives = {}
+open_archives_lock = threading.Lock()
+
+# Function to get the source of an archive opened by this process. Each worker process opens its own, as the processes started by
+# "fork" would otherwise share the position of the archive file opened by the main process.
+def open_archive(archive_path):
+    with open_archives_lock:
+        if archive_path not in open_archives or open_archives[archive_path].pid != os.getpid():
+            open_archives[archive_path] = ArchiveSource(archive_path)
+        return open_archives[archive_path]
+
+
+# Function to get the source of the "X_Y" folders of a folder or of an archive
+def open_source(path):
+    return open_archive(path) if is_archive(path) else DirectorySource(path)
+
+
+# Function to get the (identity, size, modification time) of a file or of a member (those of its archive), which change with its content
+def source_stat(file_path):
+    if isinstance(file_path, ArchiveMember):
+        stat = os.stat(file_path.archive_path)
+        return f"{os.path.abspath(file_path.archive_path)}!{file_path.name}", stat.st_size, stat.st_mtime_ns
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+# Function to get the (uncompressed) size of a file or of a member
+def source_size(file_path):
+    if isinstance(file_path, ArchiveMember):
+        return open_archive(file_path.archive_path).member_size(file_path.name)
+    return os.path.getsize(file_path)
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from multiprocessing import get_context
+from RawParser import parse_raw_file, split_pairs, decimate, format_csv_block
+from SyntheticMOSID import generate_dataset, samples_per_algorithm
+import Sequencer
+
+
+###########################################################
+#                                                         #
+#   Configuration for the Benchmark BEGIN                 #
+#                                                         #
+###########################################################
+
+# Folder where the synthetic datasets are generated during the benchmark (a temporary folder if None).
+work_directory = None
+
+# Number of boards, algorithms and iterations of the synthetic datasets.
+boards = 2
+algorithms = 5
+iterations = 2
+
+# Dataset scales to benchmark, as fractions of the real number of samples of each file.
+scales = [0.1, 0.5, 1.0]
+
+# Decimation factor of the decimation stage.
+decimation_factor = 2
+
+###########################################################
+#                                                         #
+#   Configuration for the Benchmark END                   #
+#                                                         #
+###########################################################
+
+
+# Each stage is measured over all the files of the dataset, timing only the operation of the stage (its input is prepared
+# untimed), and returns the number of samples and bytes processed and the elapsed seconds. The bytes are those read by the
+# stage (raw and CSV files), written by it (CSV and HDF5 files) or of its input arrays.
+
+def benchmark_raw_parsing(dataset):
+    samples = size = elapsed = 0
+    for board, algorithm, iteration, file_path in dataset["files"]:
+        start = time.perf_counter()
+        pairs, _ = parse_raw_file(file_path, dataset["max_samples"][algorithm - 1])
+        elapsed += time.perf_counter() - start
+        samples += pairs.size
+        size += os.path.getsize(file_path)
+    return samples, size, elapsed
+
+def benchmark_calibration(dataset):
+    samples = size = elapsed = 0
+    for board, algorithm, iteration, file_path in dataset["files"]:
+        pairs, _ = parse_raw_file(file_path, dataset["max_samples"][algorithm - 1])
+        start = time.perf_counter()
+        split_pairs(pairs, dataset["calibration"][board])
+        elapsed += time.perf_counter() - start
+        samples += pairs.size
+        size += pairs.nbytes
+    return samples, size, elapsed
+
+def benchmark_decimation(dataset):
+    samples = size = elapsed = 0
+    pair_counter = 0
+    for board, algorithm, iteration, file_path in dataset["files"]:
+        pairs, _ = parse_raw_file(file_path, dataset["max_samples"][algorithm - 1])
+        start = time.perf_counter()
+        decimated_pairs, pair_counter = decimate(pairs, dataset["decimation_factor"], pair_counter)
+        np.ascontiguousarray(decimated_pairs)
+        elapsed += time.perf_counter() - start
+        samples += pairs.size
+        size += pairs.nbytes
+    return samples, size, elapsed
+
+def benchmark_csv_writing(dataset):
+    samples = size = elapsed = 0
+    csv_path = os.path.join(dataset["directory"], "benchmark.csv")
+    with open(csv_path, mode='w', newline='') as csv_file:
+        for board, algorithm, iteration, file_path in dataset["files"]:
+            pairs, _ = parse_raw_file(file_path, dataset["max_samples"][algorithm - 1])
+            voltage, temperature = split_pairs(pairs, dataset["calibration"][board])
+            start = time.perf_counter()
+            csv_file.write(format_csv_block(voltage, temperature, board, algorithm, iteration))
+            elapsed += time.perf_counter() - start
+            samples += pairs.size
+    size = os.path.getsize(csv_path)
+    os.remove(csv_path)
+    return samples, size, elapsed
+
+def benchmark_csv_reading(dataset):
+    samples = size = elapsed = 0
+    for board, algorithm, iteration, file_path in dataset["files"]:
+        csv_path = os.path.join(dataset["csv_directory"], f"{board}_{algorithm}_{iteration}.csv")
+        start = time.perf_counter()
+        pairs = Sequencer.process_csv_file(csv_path, dataset["max_samples"][algorithm - 1] // 2)
+        elapsed += time.perf_counter() - start
+        samples += pairs.size
+        size += os.path.getsize(csv_path)
+    return samples, size, elapsed
+
+# Function to get the T-V pairs of a file as Sequencer uses them (converted values)
+def sequencer_pairs(dataset, board, algorithm, file_path):
+    pairs, _ = parse_raw_file(file_path, dataset["max_samples"][algorithm - 1])
+    voltage, temperature = split_pairs(pairs, dataset["calibration"][board])
+    return np.column_stack((voltage, temperature))
+
+def benchmark_sequencing(dataset):
+    samples = size = elapsed = 0
+    for board, algorithm, iteration, file_path in dataset["files"]:
+        pairs = sequencer_pairs(dataset, board, algorithm, file_path)
+        start = time.perf_counter()
+        file_sequences = np.asarray(Sequencer.split_sequences(pairs), dtype=Sequencer.storage_dtype)
+        elapsed += time.perf_counter() - start
+        samples += file_sequences.size
+        size += pairs.nbytes
+    return samples, size, elapsed
+
+def benchmark_hdf5_writing(dataset):
+    samples = elapsed = 0
+    file_name = os.path.join(dataset["directory"], "benchmark_sequences.h5")
+    hdf_file = Sequencer.create_sequences_file(file_name)
+    for board, algorithm, iteration, file_path in dataset["files"]:
+        file_sequences = Sequencer.split_sequences(sequencer_pairs(dataset, board, algorithm, file_path))
+        start = time.perf_counter()
+        Sequencer.append_sequences(hdf_file, board, algorithm, iteration, file_sequences)
+        elapsed += time.perf_counter() - start
+        samples += file_sequences.size
+    start = time.perf_counter()
+    hdf_file.close()
+    elapsed += time.perf_counter() - start
+    size = os.path.getsize(file_name)
+    os.remove(file_name)
+    return samples, size, elapsed
+
+# Stages of the pipelines, in the order they are benchmarked
+stages = {
+    "raw parsing": benchmark_raw_parsing,
+    "calibration": benchmark_calibration,
+    "decimation": benchmark_decimation,
+    "CSV writing": benchmark_csv_writing,
+    "CSV reading": benchmark_csv_reading,
+    "sequencing": benchmark_sequencing,
+    "HDF5 writing": benchmark_hdf5_writing
+}
+
+
+# Function to get the peak resident memory of this process in bytes (None if it cannot be measured, e.g., on Windows)
+def peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in kilobytes on Linux.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+# Function to run a stage (in its own process, so the peak memory is that of the stage)
+def run_stage(arguments):
+    stage, dataset = arguments
+    samples, size, elapsed = stages[stage](dataset)
+    peak = peak_rss()
+    return {"stage": stage, "samples": samples, "bytes": size, "seconds": elapsed,
+            "samples_per_second": samples / elapsed if elapsed else None,
+            "mb_per_second": size / 1024**2 / elapsed if elapsed else None,
+            "peak_rss_mb": peak / 1024**2 if peak is not None else None}
+
+# Function to generate a synthetic dataset of the given scale and benchmark every stage over it
+def benchmark_scale(directory, scale):
+    raw_directory = os.path.join(directory, "raw")
+    csv_directory = os.path.join(directory, "csv")
+    files = generate_dataset(raw_directory, boards, algorithms, iterations, samples_per_algorithm, scale, csv_directory=csv_directory)
+
+    table = pd.read_csv(os.path.join(raw_directory, "Table_UIDS.csv"), sep=';')
+    dataset = {
+        "directory": directory,
+        "csv_directory": csv_directory,
+        "files": files,
+        "max_samples": [int(samples * scale) for samples in samples_per_algorithm],
+        "calibration": {int(row.BOARD_NUM): (row.T_CAL_1, row.T_CAL_2, row.VREFINT_CAL) for row in table.itertuples()},
+        "decimation_factor": decimation_factor
+    }
+
+    results = []
+    # Each stage runs in a new process, started from scratch ("spawn") so it does not inherit the memory of the previous ones.
+    context = get_context("spawn")
+    for stage in stages:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_stage, ((stage, dataset),)))
+    return {"scale": scale, "files": len(files), "raw_mb": sum(os.path.getsize(file[3]) for file in files) / 1024**2, "stages": results}
+
+# Function to print the results of a scale as a table
+def print_results(results):
+    print(f"\nScale {results['scale']}: {results['files']} files, {results['raw_mb']:.1f} MB of raw data")
+    print(f"{'Stage':<14}{'Samples/s':>14}{'MB/s':>10}{'Peak RSS (MB)':>15}")
+    for stage in results["stages"]:
+        peak = f"{stage['peak_rss_mb']:.0f}" if stage["peak_rss_mb"] is not None else "n/a"
+        print(f"{stage['stage']:<14}{stage['samples_per_second']:>14,.0f}{stage['mb_per_second']:>10.1f}{peak:>15}")
+
+
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+
+
+if __name__ == "__main__":
+    # The options of the configuration section can be replaced from the command line
+    parser = argparse.ArgumentParser(description="Benchmark the stages of DataBuilder and Sequencer over synthetic datasets.")
+    parser.add_argument("--boards", type=int, default=boards)
+    parser.add_argument("--algorithms", type=int, default=algorithms)
+    parser.add_argument("--iterations", type=int, default=iterations)
+    parser.add_argument("--scales", type=float, nargs="+", default=scales, help="fractions of the real number of samples of each file")
+    parser.add_argument("--work", default=work_directory, help="folder for the synthetic datasets (a temporary folder by default)")
+    parser.add_argument("--report", help="JSON file where the results are saved")
+    arguments = parser.parse_args()
+    boards, algorithms, iterations = arguments.boards, arguments.algorithms, arguments.iterations
+
+    report = {"boards": boards, "algorithms": algorithms, "iterations": iterations, "scales": []}
+    for scale in arguments.scales:
+        directory = tempfile.mkdtemp(prefix=f"mosid_benchmark_{scale}_", dir=arguments.work)
+        try:
+            results = benchmark_scale(directory, scale)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print_results(results)
+        report["scales"].append(results)
+
+    if arguments.report:
+        with open(arguments.report, "w") as report_file:
+            json.dump(report, report_file, indent=1)
+        print(f"\nThe results have been saved in '{arguments.report}'.")
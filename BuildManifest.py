@@ -0,0 +1,67 @@
+import os
+import json
+import hashlib
+from ArchiveSource import source_stat
+
+# Manifest of the outputs generated by a build, stored as a JSON Lines file with one line per completed output.
+# Each line records the inputs (path, size and modification time), the configuration and the checksum of an output, so a rerun
+# can skip the outputs that are up to date and regenerate only the stale or missing ones. Lines are only appended after the
+# output has been completely written, so an interrupted build resumes from the last completed output.
+class BuildManifest:
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.records = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as manifest_file:
+                for line in manifest_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Line left incomplete by an interrupted build
+                    # Later lines replace the previous records of the same output.
+                    self.records[record["output"]] = record
+
+    # Function to get the name of an output in the manifest: its path relative to the folder of the manifest
+    # (the file name of the outputs written next to the manifest, and e.g. "ACQ1/1_1_1.csv" for those of subfolders).
+    def output_name(self, output_path):
+        return os.path.relpath(output_path, os.path.dirname(os.path.abspath(self.manifest_path))).replace(os.sep, "/")
+
+    # Function to check whether an output exists and was generated from the same inputs and configuration
+    def is_up_to_date(self, output_path, input_paths, config):
+        record = self.records.get(self.output_name(output_path))
+        if record is None or not os.path.exists(output_path):
+            return False
+        stat = os.stat(output_path)
+        return (record["inputs"] == input_signature(input_paths) and record["config"] == config
+                and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns)
+
+    # Function to record a completed output, along with its inputs, configuration and checksum
+    def record(self, output_path, input_paths, config, checksum):
+        stat = os.stat(output_path)
+        record = {
+            "output": self.output_name(output_path),
+            "inputs": input_signature(input_paths),
+            "config": config,
+            "checksum": checksum,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+        self.records[record["output"]] = record
+        with open(self.manifest_path, "a") as manifest_file:
+            manifest_file.write(json.dumps(record) + "\n")
+
+
+# Function to get the (path, size, modification time) signature of the input files of an output.
+# The members of an archive (see ArchiveSource) have the size and modification time of the archive.
+def input_signature(input_paths):
+    return [list(source_stat(input_path)) for input_path in input_paths]
+
+
+# Function to compute the SHA-256 checksum of a file
+def file_checksum(file_path):
+    checksum = hashlib.sha256()
+    with open(file_path, "rb") as opened_file:
+        for block in iter(lambda: opened_file.read(1024 * 1024), b""):
+            checksum.update(block)
+    return checksum.hexdigest()
@@ -0,0 +1,52 @@
+import numpy as np
+from RawParser import calibrate_readings
+
+# Data type of the raw ADC readings (12-bit conversions) in the columnar files.
+raw_dtype = np.uint16
+
+# Data type of the converted Temperature (ºC) and Voltage (V) values in the columnar files.
+calibrated_dtype = np.float64
+
+# Name of the array with the (t_cal_1, t_cal_2, vrefint_cal) calibration of the board, in the partitions that keep the raw readings
+# of a T-V normalized build (converted when they are read).
+calibration_key = "calibration"
+
+# Function to write the converted files of a board/algorithm pair into a compressed columnar ".npz" file (one partition).
+# "blocks" is a list of (voltage, temperature, iteration) tuples, one per file, and "fields" gives the name of each column.
+# If the "calibration" of the board is given, it is saved along with the raw readings so they are converted on reading.
+def write_partition(file_path, fields, board, algorithm, blocks, calibration=None):
+    voltage = np.concatenate([block[0] for block in blocks])
+    temperature = np.concatenate([block[1] for block in blocks])
+    iteration = np.concatenate([np.full(len(block[0]), block[2]) for block in blocks])
+
+    # Raw ADC readings fit in 16 bits, and the label columns use the smallest unsigned type that holds their values.
+    value_dtype = raw_dtype if voltage.dtype.kind in "iu" else calibrated_dtype
+    columns = {
+        fields[0]: voltage.astype(value_dtype),
+        fields[1]: temperature.astype(value_dtype),
+        fields[2]: np.full(len(voltage), board, dtype=np.min_scalar_type(board)),
+        fields[3]: np.full(len(voltage), algorithm, dtype=np.min_scalar_type(algorithm)),
+        fields[4]: iteration.astype(np.min_scalar_type(iteration.max(initial=0)))
+    }
+    if calibration is not None:
+        columns[calibration_key] = np.asarray(calibration, dtype=np.float64)
+    np.savez_compressed(file_path, **columns)
+
+
+# Function to read the selected columns (all of them by default) of a columnar ".npz" file into a dict of arrays.
+# Only the requested columns are decompressed. The raw readings of the partitions saved with the calibration of their board are
+# converted into V and ºC values of "dtype" (float32 or float64), unless "calibrate" is False.
+def read_partition(file_path, columns=None, calibrate=True, dtype=calibrated_dtype):
+    with np.load(file_path) as partition:
+        fields = [column for column in partition.files if column != calibration_key]
+        if columns is None:
+            columns = fields
+        result = {column: partition[column] for column in columns}
+        if calibrate and calibration_key in partition.files:
+            calibration = partition[calibration_key]
+            # The voltage and temperature columns are the first two fields (see write_partition).
+            voltage, temperature = calibrate_readings(result.get(fields[0]), result.get(fields[1]), calibration, dtype)
+            for column, values in [(fields[0], voltage), (fields[1], temperature)]:
+                if column in result:
+                    result[column] = values
+        return result
@@ -1,604 +1,813 @@
-import os
-import csv
-import pandas as pd
-from tqdm import tqdm
-import time
-import re
-
-# Base directory where the folders containing the data are located.
-base_directory = "DiskUnit:/path/to/Data's/Folders"
-
-destination_folder = "DiskUnit:/path/to/New/Data/Folder"
-
-# The address of the CSV table with the sensor calibration values for the boards must be within the base_folder.
-boards_data_table = "DiskUnit:/path/to/Data/Folder/Table_UIDS.csv"
-
-
-# Maximum value for X and Y.
-boards = 10      # Change this to the maximum value you desire for X (NUM_BOARDS).
-algorithms = 5  # Change this to the maximum value you desire for Y (NUM_ALGTH)
-iterations = 2  # Change this to the maximum value you desire for Z (NUM_DATOS)
-
-# List with the maximum number of samples per algorithm.
-max_samples = [159200, 159200, 200000, 140000, 24000] # number of samples per algorithm, in checking order:
-# A1_SIZE = 159200
-# A2_SIZE = 159200
-# A3_SIZE = 200000
-# A4_SIZE = 140000
-# A5_SIZE = 24000
-
-# Counter to control the decimation.
-pair_counter = 0  
-
-# List of discarded algorithms.
-discarded_algths = []
-# List of discarded boards.
-discarded_boards = []
-
-# Name of the unified CSV file.
-csv_filename_unified = f"raw_dataset_{boards}_{algorithms}_{iterations}.csv"
-
-# List for storing data from all the files.
-data = []
-
-# Define the column labels.
-fields = ["Voltage Value", "Temperature Value", "Board Number", "Algorithm", "Iteration"]
-
-# Regular expression to extract numbers: 
-pattern = r'\d+'
-
-# "Discard Algorithms" Template
-discard_algorithms_template = {
-    "label": "Discard Algorithms", 
-    "config_option": [], 
-    "suboptions": [],
-    "type": "multiple",
-    "numeric": False
-}
-
-# "Discard Boards" Template
-discard_boards_template = {
-    "label": "Discard Boards", 
-    "config_option": [], 
-    "suboptions": [],
-    "type": "multiple",
-    "numeric": False
-}
-
-# To generate the "Discard Algorithms" section based on the number of algorithms
-for i in range(1, algorithms + 1):
-    algorithm = {
-        "label": f"Algorithm {i}",
-        "selected": False
-    }
-    discard_algorithms_template["suboptions"].append(algorithm)
-
-# To generate the "Discard Boards" section based on the number of boards
-for i in range(1, boards + 1):
-    board = {
-        "label": f"Board {i}",
-        "selected": False
-    }
-    discard_boards_template["suboptions"].append(board)
-
-#################################################################################################################################
-#################################################################################################################################  
-
-
-operation_accepted = False
-config_format_option = []
-config_algths_option = []
-config_boards_option = []
-config_decimation_option = []
-config_normalize_option = []
-
-# Create a list for each option and its selected configuration, along with the option type.
-menu_options = [
-    {"label": "Select Output Format", "config_option": ["Unified"], "suboptions": [
-    {"label": "Unified", "selected": False},
-    {"label": "Multiple Files", "selected": False}
-    ], "type": "single", "numeric": False},
-    # {"label": "Discard Algorithms", "config_option": [], "suboptions": [
-        # # Comment or add new algoritm labels if needed according your application
-        # {"label": "algorithm 1", "selected": False},
-        # {"label": "algorithm 2", "selected": False},
-        # {"label": "algorithm 3", "selected": False},
-        # {"label": "algorithm 4", "selected": False},
-        # {"label": "algorithm 5", "selected": False}
-    # ], "type": "multiple", "numeric": False},
-    # {"label": "Discard Boards", "config_option": [], "suboptions": [
-        # # Comment or add new board labels if needed according your application
-        # {"label": "Board 1", "selected": False},
-        # {"label": "Board 2", "selected": False},
-        # {"label": "Board 3", "selected": False},
-        # {"label": "Board 4", "selected": False},
-        # {"label": "Board 5", "selected": False},
-        # {"label": "Board 6", "selected": False},
-        # {"label": "Board 7", "selected": False},
-        # {"label": "Board 8", "selected": False},
-        # {"label": "Board 9", "selected": False},
-        # {"label": "Board 10", "selected": False},
-        # {"label": "Board 11", "selected": False},
-        # {"label": "Board 12", "selected": False},
-        # {"label": "Board 13", "selected": False},
-        # {"label": "Board 14", "selected": False},
-        # {"label": "Board 15", "selected": False},
-        # {"label": "Board 16", "selected": False},
-        # {"label": "Board 17", "selected": False},
-        # {"label": "Board 18", "selected": False},
-        # {"label": "Board 19", "selected": False},
-        # {"label": "Board 20", "selected": False}
-    # ], "type": "multiple", "numeric": False},
-    {"label": "Decimation Factor", "config_option": [1], "suboptions": [], "type": "single", "numeric": True},
-    {"label": "T-V Normalization", "config_option": [False], "suboptions": [], "type": "normalization", "numeric": False},
-    {"label": "Generate File", "config_option": [], "suboptions": [], "type": "verification"}
-]
-
-# Add the generated parts in a specific location of the menu_options list
-menu_options.insert(1, discard_algorithms_template)     # Insert "Discard Algorithms" at position 2 (Option 1 starts at 0)
-menu_options.insert(2, discard_boards_template)         # Insert "Discard Boards" at position 3 (Option 1 starts at 0)
-
-# Custom function to extract the number "Z" from the file name
-def get_Z_number(file):
-    try:
-        number_Z = int(file.split("_")[1].split(".")[0])
-        return number_Z
-    except ValueError:
-        return float('inf')  # Return infinity to handle files without a Z number
-
-
-# Function to clear the screen
-def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-
-def show_main_menu():
-    clear_screen()
-    print("\n***********************************")
-    print("**                               **")
-    print("**     Raw Data Builder Menu     **")
-    print("**                               **")
-    print("***********************************\n")
-    for index, option in enumerate(menu_options, start=1):
-        label = option["label"]
-        configuration = option["config_option"]
-        type = option["type"]
-        if type == "single":
-            if configuration:
-                value = configuration[0]
-                if "numeric" in option:
-                    print(f"{index}. {label} ({value})")
-                else:
-                    print(f"{index}. {label} ({value})")
-            else:
-                print(f"{index}. {label}")
-        elif type == "multiple":
-            suboptions = option["suboptions"]
-            selected_sublabels = [suboption["label"] for suboption in suboptions if suboption['selected']] 
-            if selected_sublabels:
-            
-                if(option == menu_options[1]):
-                    config_algths_option.clear()
-                    for element in selected_sublabels:
-                        # Search for matches in the current element
-                        match = re.search(pattern, element)
-                        if match:
-                            # Retrieve the found number and add it to the list
-                            number = int(match.group())
-                            config_algths_option.append(number)
-                            
-                if(option == menu_options[2]):
-                    config_boards_option.clear()
-                    for element in selected_sublabels:
-                        # Search for matches in the current element
-                        match = re.search(pattern, element)
-                        if match:
-                            # Obtain the found number and add it to the list
-                            number = int(match.group())
-                            config_boards_option.append(number)
-                   
-                sublabels_str = ", ".join(selected_sublabels)
-                print(f"{index}. {label} ({sublabels_str})")
-            else:
-                print(f"{index}. {label}")
-        elif type == "normalization":
-            current_value = "Yes" if configuration[0] else "No"
-            print(f"{index}. {label} ({current_value})")
-        elif type == "verification":
-            if all(configuration):
-                print(f"{index}. {label} (Available)")
-            else:
-                print(f"{index}. {label} (Blocked)")
-
-    print("0. Salir")
-    
-def check_option_6_available():
-    option_6 = menu_options[5]  # "Option 6" is located at position 5 in the list
-    return all(option_6["config_option"])
-
-def submenu(option):
-    current_option = menu_options[option]
-    suboptions = current_option["suboptions"]
-    type = current_option["type"]
-    numeric = current_option["numeric"]
-    
-    while True:
-        clear_screen()
-        print(f"\n{current_option['label']} Submenu")
-        print("\n--- Submenu ---\n")
-        if type == "single":
-            if numeric:
-                print("Enter a value for the Decimation Factor:")
-                print(f"Current Value: {current_option['config_option'][0]}")
-            else:
-                print("1. Unified")
-                print("2. Multiple Files")
-        elif type == "multiple":
-            for index, suboption in enumerate(suboptions, start=1):
-                marker = "[X]" if suboption["selected"] else "[ ]"
-                print(f"{index}. {marker} {suboption['label']}")
-        elif type == "normalization":
-            current_value = "Yes" if current_option["config_option"][0] else "No"
-            print(f"Current Value: {current_value}")
-            print("1. Yes")
-            print("2. No")
-        print("0. Back to the main menu")
-        
-        if type == "single" and numeric:
-            selection = input("\nNew value for the Decimation Factor: ")
-            if selection == "0":
-                clear_screen()
-                print("Canceling the Decimation Factor modification...")
-                break
-            elif selection.isdigit():
-                new_value = int(selection)
-                if new_value >= 1:
-                    current_option["config_option"] = [new_value]
-                else:
-                    clear_screen()
-                    print("Invalid value. It must be greater than or equal to 1. Please try again.")
-            else:
-                clear_screen()
-                print("Invalid input. It must be an integer.")
-        elif type == "single" and not numeric:
-            selection = input("\nSelect an option (1-2), 0 to go back): ")
-            if selection == "0":
-                break
-            elif selection == "1":
-                current_option["config_option"] = ["Unified"]
-                break
-            elif selection == "2":
-                current_option["config_option"] = ["Multiple Files"]
-                break
-            else:
-                clear_screen()
-                print("Invalid option. Please select a valid option.")
-        elif type == "normalization":
-            selection = input("\nSelect an option for T-V Normalization (1:Yes, 2:No, 0 to go back): ")
-            if selection == "0":
-                break
-            elif selection == "1":
-                current_option["config_option"] = [True]
-                break
-            elif selection == "2":
-                current_option["config_option"] = [False]
-                break
-            else:
-                clear_screen()
-                print("Invalid option. Please select 'Yes' or 'No'.")
-        else:
-            selection = input("\nSelect a Suboption: ")
-
-            if selection == "0":
-                clear_screen()
-                print("Returning to the main menu...")
-                break
-            elif selection.isdigit():
-                number_selection = int(selection)
-                if 1 <= number_selection <= len(suboptions):
-                    current_suboption = suboptions[number_selection - 1]
-                    current_suboption["selected"] = not current_suboption["selected"]
-                else:
-                    clear_screen()
-                    print("Invalid sub-option. Please select a valid sub-option.")
-            else:
-                clear_screen()
-                print("Invalid sub-option. Please select a valid sub-option.")
-
-#################################################################################################################################
-#################################################################################################################################
-
-while True:
-    show_main_menu()
-    main_selection = input("\nSelect an option (0-6): ")
-
-    if main_selection == "0":
-        clear_screen()
-        print("Exiting the program...")
-        break
-    elif main_selection.isdigit():
-        number_selection = int(main_selection)
-        if 1 <= number_selection <= len(menu_options):
-            if number_selection == 6:  # If selected "Option 6"
-                if check_option_6_available():
-                    clear_screen()
-                    
-                    config_format_option = menu_options[0]["config_option"]
-                    config_decimation_option = menu_options[3]["config_option"]
-                    config_normalize_option = menu_options[4]["config_option"]
-                    
-                    print("Configuration Preview:")
-                    chain_elements = ', '.join(map(str, config_format_option))
-                    print(f"\nOutput format of the .csv file: {chain_elements}")
-                    chain_elements = None
-                    
-                    chain_elements = ', '.join(map(str, config_algths_option))
-                    print(f"Discarded Algorithms: {chain_elements}")
-                    chain_elements = None
-                    
-                    chain_elements = ', '.join(map(str, config_boards_option))
-                    print(f"Discarded Boards: {chain_elements}")
-                    chain_elements = None
-                    
-                    chain_elements = ', '.join(map(str, config_decimation_option))
-                    print(f"Decimation Factor: {chain_elements}")
-                    chain_elements = None
-                    
-                    chain_elements = ', '.join(map(str, config_normalize_option))
-                    print(f"T-V Normalization: {chain_elements}\n")
-                    chain_elements = None
-                    
-                    confirmation = input("Do you want to generate the file? (y/n): ")
-                    
-                    if confirmation.lower() == "y":
-                        operation_accepted = True             
-                        time.sleep(2)
-                        clear_screen()
-                        print("Generating File...")                      
-                        break
-                    else:
-                        clear_screen()
-                        print("Operation canceled. Returning to the main menu...")
-                        time.sleep(1)
-                else:
-                    clear_screen()
-                    print("Option 6 is locked due to incomplete configurations.")
-                    input("Press Enter to continue...")
-            else:
-                submenu(number_selection - 1)
-        else:
-            clear_screen()
-            print("Invalid option. Please select a valid option.")
-    else:
-        clear_screen()
-        print("Invalid option. Please select a valid option.")
-
-#################################################################################################################################
-#################################################################################################################################
-   
-if(operation_accepted == True):
-    
-    # Load T-V Normalization Table if selected
-    if(config_normalize_option[0] == True):
-        # Read the CSV file into a pandas DataFrame, be careful with the path, which should contain the table name with its extension.
-        df = pd.read_csv(boards_data_table, sep = ';')
-    
-    # Progress Bar parametrization
-    total = 100
-    unit = float(100/((boards - len(config_boards_option))*(algorithms - len(config_algths_option))*iterations))
-
-    if(config_format_option[0] == "Unified"):
-        # Take actions for the unified option.
-        print("... creating the unified .csv file.")
-        progress_bar_uni = tqdm(total=total, desc="Procesing")
-        
-        # Loop to iterate through the folders within the specified range.
-        for board in range(1, boards + 1):  #** Boards are scanned.
-            # If board has been discarded, skip
-            if board in config_boards_option:
-                continue
-            if(config_normalize_option[0] == True):
-                # Filter the DataFrame to obtain the rows where 'BOARD_NUM' matches
-                selected_row = df[df['BOARD_NUM'] == board]
-                # Access the values of the other columns
-                t_cal_1 = selected_row['T_CAL_1'].values[0]
-                t_cal_2 = selected_row['T_CAL_2'].values[0]
-                vrefint_cal = selected_row['VREFINT_CAL'].values[0]
-            
-            for algorithm in range(1, algorithms + 1):  #** Evaluated algorithms for each board are scanned.
-                # If algorithm has been discarded, skip
-                if algorithm in config_algths_option:
-                    continue
-                folder = f"{board}_{algorithm}"
-                complete_folder = os.path.join(base_directory, folder)
-
-                # Check if the folder exists.
-                if os.path.exists(complete_folder):
-                    # Get the list of files in the current folder.
-                    files = os.listdir(complete_folder)
-                    
-                    # Filter the files that match the format "data_Z.txt"
-                    files_data = [file for file in files if file.startswith("data_") and file.endswith(".txt")]
-                    
-                    # Sort the files using the custom function.
-                    files_data.sort(key=get_Z_number)
-                    
-                    # Iterate through the data files in the current folder.
-                    for file in files_data: #** The created files from each iteration of the evaluated algorithm on each board are processed.                                                                          
-                        iteration = get_Z_number(file)
-                        if(iteration > iterations):
-                            break
-                        complete_file = os.path.join(complete_folder, file)
-                        
-                        # Perform data reading from the file.
-                        with open(complete_file, "r") as opened_file:
-                            lines = opened_file.readlines()
-                            num_samples = len(lines) - 6
-                            EOD = max_samples[algorithm - 1] + 4
-                            
-                            # Initialize variables for temperature and voltage.
-                            temperature = None
-                            voltage = None
-                            
-                            for i in range(4, EOD):
-
-                                if i % 2 == 0:  # If it's an even line, it's temperature.
-                                    temperature = int(lines[i])
-                                else:  # If it's an odd line, it's voltage.
-                                    voltage = int(lines[i])
-                                    
-                                    if (pair_counter % config_decimation_option[0]) == 0:
-                                        if temperature is not None and voltage is not None:
-                                            # In case normalization is desired, perform it and save the resulting data in its corresponding format.
-                                            if(config_normalize_option[0] == True):
-                                                data.append({
-                                                    "Voltage Value": float( 3 * (vrefint_cal / voltage) ),
-                                                    "Temperature Value": float( (( 80 / (t_cal_2 - t_cal_1) ) * ( temperature - t_cal_1 )) + 30 ),
-                                                    "Board Number": board,
-                                                    "Algorithm": algorithm,
-                                                    "Iteration": iteration
-                                                })
-                                            else:
-                                                data.append({
-                                                    "Voltage Value": voltage,
-                                                    "Temperature Value": temperature,
-                                                    "Board Number": board,
-                                                    "Algorithm": algorithm,
-                                                    "Iteration": iteration
-                                                })
-                                            temperature = None
-                                            voltage = None
-                                    pair_counter += 1
-                                    if pair_counter == config_decimation_option[0]:
-                                        pair_counter = 0
-                       
-                        print(f"ID Board: {board}, Algorithm: {algorithm}, Iteration File: {file}, Total Samples: {num_samples}")
-                        progress_bar_uni.update(int(unit))
-                        
-        # Write the data to the CSV file with a semicolon (;) as the delimiter.
-        with open(csv_filename_unified, mode='w', newline='') as csv_file:
-            writer = csv.DictWriter(csv_file, fieldnames=fields, delimiter=';')
-            
-            # Write the column labels.
-            writer.writeheader()
-            
-            # Write the data for each row.
-            for row in data:
-                writer.writerow(row)
-
-        print(f"The CSV file '{csv_filename_unified}' has been successfully created.")
-        progress_bar_uni.close()
-        print("\nProcess complete")    
-
-
-    if(config_format_option[0] == "Multiple Files"):
-        # Take actions for the multiple option.
-        print("... creating the multiples .csv files.")
-        progress_bar_uni = tqdm(total=total, desc="Procesing")
-        
-        # Loop to iterate through the folders within the specified range.
-        for board in range(1, boards + 1):  #** Boards are scanned.
-            # If board has been discarded, skip
-            if board in config_boards_option:
-                continue
-            if(config_normalize_option[0] == True):
-                # Filter the DataFrame to obtain the rows where 'BOARD_NUM' matches
-                selected_row = df[df['BOARD_NUM'] == board]
-                # Access the values of the other columns
-                t_cal_1 = selected_row['T_CAL_1'].values[0]
-                t_cal_2 = selected_row['T_CAL_2'].values[0]
-                vrefint_cal = selected_row['VREFINT_CAL'].values[0]
-                
-            for algorithm in range(1, algorithms + 1):  #** Evaluated algorithms for each board are scanned.
-                # If algorithm has been discarded, skip
-                if algorithm in config_algths_option:
-                    continue
-                folder = f"{board}_{algorithm}"
-                complete_folder = os.path.join(base_directory, folder)
-
-                # Check if the folder exists.
-                if os.path.exists(complete_folder):
-                    # Get the list of files in the current folder.
-                    files = os.listdir(complete_folder)
-                    
-                    # Filter the files that match the format "data_Z.txt"
-                    files_data = [file for file in files if file.startswith("data_") and file.endswith(".txt")]
-                    
-                    # Sort the files using the custom function.
-                    files_data.sort(key=get_Z_number)
-                    
-                    # Iterate through the data files in the current folder.
-                    for file in files_data: #** The created files from each iteration of the evaluated algorithm on each board are processed.                                                                          
-                        iteration = get_Z_number(file)
-                        if(iteration > iterations):
-                            break
-                        complete_file = os.path.join(complete_folder, file)
-                        
-                        # Perform data reading from the file.
-                        with open(complete_file, "r") as opened_file:
-                            lines = opened_file.readlines()
-                            num_samples = len(lines) - 6
-                            EOD = max_samples[algorithm - 1] + 4
-                            
-                            # Initialize variables for temperature and voltage.
-                            temperature = None
-                            voltage = None
-                            
-                            for i in range(4, EOD ):
-
-                                if i % 2 == 0:  # If it's an even line, it's temperature.
-                                    temperature = int(lines[i])
-                                else:  # If it's an odd line, it's voltage.
-                                    voltage = int(lines[i])
-             
-                                    if (pair_counter % config_decimation_option[0]) == 0:
-                                        if temperature is not None and voltage is not None:
-                                            # In case normalization is desired, perform it and save the resulting data in its corresponding format.
-                                            if(config_normalize_option[0] == True):
-                                                data.append({
-                                                    "Voltage Value": float( 3 * (vrefint_cal / voltage) ),
-                                                    "Temperature Value": float( (( 80 / (t_cal_2 - t_cal_1) ) * ( temperature - t_cal_1 )) + 30 ),
-                                                    "Board Number": board,
-                                                    "Algorithm": algorithm,
-                                                    "Iteration": iteration
-                                                })
-                                            else:
-                                                data.append({
-                                                    "Voltage Value": voltage,
-                                                    "Temperature Value": temperature,
-                                                    "Board Number": board,
-                                                    "Algorithm": algorithm,
-                                                    "Iteration": iteration
-                                                })
-                                            temperature = None
-                                            voltage = None
-                                    pair_counter += 1
-                                    if pair_counter == config_decimation_option[0]:
-                                        pair_counter = 0
-                       
-                        print(f"ID Board: {board}, Algorithm: {algorithm}, Iteration File: {file}, Total Samples: {num_samples}")
-                        
-                        csv_filename_multiple = f"{board}_{algorithm}_{iteration}.csv"
-                        if not os.path.exists(destination_folder):
-                            # If it doesn't exist, create it
-                            os.makedirs(destination_folder)
-                        csv_filename_multiple_destination = os.path.join(destination_folder, csv_filename_multiple)
-                        # Write the data to the CSV file with a semicolon (;) as the delimiter.
-                        with open(csv_filename_multiple_destination, mode='w', newline='') as csv_file:
-                            writer = csv.DictWriter(csv_file, fieldnames=fields, delimiter=';')
-                            
-                            # Write the column labels.
-                            writer.writeheader()
-                            
-                            # Write the data for each row.
-                            for row in data:
-                                writer.writerow(row)
-                                
-                            data.clear()
-                        print(f"The CSV file '{csv_filename_multiple}' has been successfully created.")
-                        progress_bar_uni.update(int(unit))
-                        
-        progress_bar_uni.close()
-        print("\nProcess complete")    
-        
-        
+import os
+import csv
+import pandas as pd
+from tqdm import tqdm
+import time
+import re
+from collections import deque
+from itertools import repeat
+from multiprocessing import Pool
+from RawParser import convert_file_job, convert_array_job, prefetch_job
+from Prefetcher import Prefetcher
+from ArchiveSource import open_source, reading_workers
+from DatasetCatalog import DatasetCatalog
+from ColumnarFormat import write_partition
+from DatasetStore import DatasetStoreWriter, acquisition_field
+from BuildManifest import BuildManifest, file_checksum
+from Instrumentation import RunReport, measure, count
+
+# Base directory where the folders containing the data are located, or the path of the archive of the dataset (.zip, .tar or .tar.gz),
+# whose files are read directly from the archive without extracting it.
+base_directory = "DiskUnit:/path/to/Data's/Folders"
+
+destination_folder = "DiskUnit:/path/to/New/Data/Folder"
+
+# The address of the CSV table with the sensor calibration values for the boards must be within the base_folder.
+boards_data_table = "DiskUnit:/path/to/Data/Folder/Table_UIDS.csv"
+
+
+# Maximum value for X and Y.
+boards = 10      # Change this to the maximum value you desire for X (NUM_BOARDS).
+algorithms = 5  # Change this to the maximum value you desire for Y (NUM_ALGTH)
+iterations = 2  # Change this to the maximum value you desire for Z (NUM_DATOS)
+
+# List with the maximum number of samples per algorithm.
+max_samples = [159200, 159200, 200000, 140000, 24000] # number of samples per algorithm, in checking order:
+# A1_SIZE = 159200
+# A2_SIZE = 159200
+# A3_SIZE = 200000
+# A4_SIZE = 140000
+# A5_SIZE = 24000
+
+# Counter to control the decimation.
+pair_counter = 0  
+
+# Decimation method: "stride" keeps one out of every "Decimation Factor" pairs, and "mean" averages each block of "Decimation Factor"
+# pairs into one (after the T-V Normalization, discarding the incomplete blocks at the start and end of each file, so the converted
+# values are averaged and "calibrate_on_read" cannot be used).
+decimation_method = "stride"
+
+# Decimation phase of each file: "carry" continues the phase of the previous file, and "reset" starts every file at a new block (its
+# first pair is always kept). The phases are planned before reading the files: with a catalog ("catalog_path") from the actual number
+# of samples of each file, so the pairs are kept as if the files were a single sequence, and otherwise assuming that every file has
+# its "max_samples" samples (the phase then shifts after a file with fewer samples).
+decimation_phase = "carry"
+
+# Number of worker processes used to convert the files (1 converts them one after another in the main process).
+parallel_workers = 1
+
+# Catalog of the dataset (see DatasetCatalog) from which the files of the "catalog_acquisition" acquisition are listed, along with their
+# number of samples, instead of scanning the folders of "base_directory" (None to scan them).
+catalog_path = None
+catalog_acquisition = "ACQ1"
+
+# Acquisitions built in a single run, as {name: base directory or archive of the acquisition} (e.g., {"ACQ1": "DiskUnit:/path/to/ACQ1",
+# "ACQ4": "DiskUnit:/path/to/ACQ4.zip"}), or None to build only "base_directory". The files of all the acquisitions are converted in
+# a single job queue. The name of the acquisition of each file is added as the last column ("Acquisition") of the CSV formats, the
+# Multiple Files and Columnar files of each acquisition are written to a subfolder of the destination folder named after it, and each
+# acquisition is added to the store with its name (Store format). With a catalog, the files of each acquisition are listed from the
+# catalog and the folders are not used (their values can be None). The boards missing from an acquisition (e.g., 18 of 20 boards) are skipped.
+acquisitions = None
+
+# Number of "data_Z.txt" files read ahead by background threads while the current one is converted, so the reads (e.g., from a network
+# share) overlap with the conversion (0 reads each file when it is converted). Only used when the files are converted in this process.
+prefetch_files = 2
+
+# Folder where the parsed "data_Z.txt" files are cached as .npy arrays, so that later builds do not parse them again (None disables the cache).
+cache_directory = None
+# Maximum size of the cache folder in bytes, the least recently used files are removed when it is exceeded.
+cache_max_bytes = 4 * 1024**3
+
+# Record the generated files in a build manifest within the destination folder (Multiple Files format), so that a new run
+# skips the files that are up to date and only generates the missing or stale ones (e.g., after an interrupted build).
+use_build_manifest = False
+manifest_filename = "build_manifest.jsonl"
+
+# List of discarded algorithms.
+discarded_algths = []
+# List of discarded boards.
+discarded_boards = []
+
+# Name of the acquisition added to the dataset store (Store format), which can hold several acquisitions in the same destination folder.
+store_acquisition = "ACQ1"
+
+# With T-V Normalization, keep the raw ADC readings (16 bits) and the calibration values of each board in the Columnar and Store
+# formats instead of the converted values (float64), which are then converted when the files are read (see ColumnarFormat and DatasetStore).
+calibrate_on_read = False
+
+# Name of the unified CSV file.
+csv_filename_unified = f"raw_dataset_{boards}_{algorithms}_{iterations}.csv"
+
+# List for storing the converted rows waiting to be written to the unified CSV file.
+data = []
+
+# Maximum number of rows kept in memory before they are written to the unified CSV file.
+chunk_size = 1000000
+
+# Name of the JSON report with the time, throughput and memory of each stage and file of the build, saved in the current directory (None to not save it).
+# It is not saved in the destination folder, whose Multiple Files CSVs are the input folder of Sequencer.
+run_report_filename = "build_report.json"
+
+# Define the column labels.
+fields = ["Voltage Value", "Temperature Value", "Board Number", "Algorithm", "Iteration"]
+
+# Regular expression to extract numbers: 
+pattern = r'\d+'
+
+# "Discard Algorithms" Template
+discard_algorithms_template = {
+    "label": "Discard Algorithms", 
+    "config_option": [], 
+    "suboptions": [],
+    "type": "multiple",
+    "numeric": False
+}
+
+# "Discard Boards" Template
+discard_boards_template = {
+    "label": "Discard Boards", 
+    "config_option": [], 
+    "suboptions": [],
+    "type": "multiple",
+    "numeric": False
+}
+
+# To generate the "Discard Algorithms" section based on the number of algorithms
+for i in range(1, algorithms + 1):
+    algorithm = {
+        "label": f"Algorithm {i}",
+        "selected": False
+    }
+    discard_algorithms_template["suboptions"].append(algorithm)
+
+# To generate the "Discard Boards" section based on the number of boards
+for i in range(1, boards + 1):
+    board = {
+        "label": f"Board {i}",
+        "selected": False
+    }
+    discard_boards_template["suboptions"].append(board)
+
+#################################################################################################################################
+#################################################################################################################################  
+
+
+operation_accepted = False
+config_format_option = []
+config_algths_option = []
+config_boards_option = []
+config_decimation_option = []
+config_normalize_option = []
+
+# Create a list for each option and its selected configuration, along with the option type.
+menu_options = [
+    {"label": "Select Output Format", "config_option": ["Unified"], "suboptions": [
+    {"label": "Unified", "selected": False},
+    {"label": "Multiple Files", "selected": False},
+    {"label": "Columnar", "selected": False},
+    {"label": "Store", "selected": False}
+    ], "type": "single", "numeric": False},
+    # {"label": "Discard Algorithms", "config_option": [], "suboptions": [
+        # # Comment or add new algoritm labels if needed according your application
+        # {"label": "algorithm 1", "selected": False},
+        # {"label": "algorithm 2", "selected": False},
+        # {"label": "algorithm 3", "selected": False},
+        # {"label": "algorithm 4", "selected": False},
+        # {"label": "algorithm 5", "selected": False}
+    # ], "type": "multiple", "numeric": False},
+    # {"label": "Discard Boards", "config_option": [], "suboptions": [
+        # # Comment or add new board labels if needed according your application
+        # {"label": "Board 1", "selected": False},
+        # {"label": "Board 2", "selected": False},
+        # {"label": "Board 3", "selected": False},
+        # {"label": "Board 4", "selected": False},
+        # {"label": "Board 5", "selected": False},
+        # {"label": "Board 6", "selected": False},
+        # {"label": "Board 7", "selected": False},
+        # {"label": "Board 8", "selected": False},
+        # {"label": "Board 9", "selected": False},
+        # {"label": "Board 10", "selected": False},
+        # {"label": "Board 11", "selected": False},
+        # {"label": "Board 12", "selected": False},
+        # {"label": "Board 13", "selected": False},
+        # {"label": "Board 14", "selected": False},
+        # {"label": "Board 15", "selected": False},
+        # {"label": "Board 16", "selected": False},
+        # {"label": "Board 17", "selected": False},
+        # {"label": "Board 18", "selected": False},
+        # {"label": "Board 19", "selected": False},
+        # {"label": "Board 20", "selected": False}
+    # ], "type": "multiple", "numeric": False},
+    {"label": "Decimation Factor", "config_option": [1], "suboptions": [], "type": "single", "numeric": True},
+    {"label": "T-V Normalization", "config_option": [False], "suboptions": [], "type": "normalization", "numeric": False},
+    {"label": "Generate File", "config_option": [], "suboptions": [], "type": "verification"}
+]
+
+# Add the generated parts in a specific location of the menu_options list
+menu_options.insert(1, discard_algorithms_template)     # Insert "Discard Algorithms" at position 2 (Option 1 starts at 0)
+menu_options.insert(2, discard_boards_template)         # Insert "Discard Boards" at position 3 (Option 1 starts at 0)
+
+# Custom function to extract the number "Z" from the file name
+def get_Z_number(file):
+    try:
+        number_Z = int(file.split("_")[1].split(".")[0])
+        return number_Z
+    except ValueError:
+        return float('inf')  # Return infinity to handle files without a Z number
+
+
+# Function to run "function" over "jobs" in a pool of processes, returning the results in order.
+# At most "window" results are pending at a time, so a slow writer does not make the results pile up in memory. If the size of each
+# job is given ("job_sizes", e.g., its number of samples), "window" bounds the total size of the pending jobs instead.
+def imap_bounded(pool, function, jobs, window, job_sizes=None):
+    pending = deque()
+    pending_size = 0
+    for job, job_size in zip(jobs, job_sizes if job_sizes is not None else repeat(1)):
+        pending.append((pool.apply_async(function, (job,)), job_size))
+        pending_size += job_size
+        while pending and pending_size >= window:
+            result, result_size = pending.popleft()
+            pending_size -= result_size
+            yield result.get()
+    while pending:
+        yield pending.popleft()[0].get()
+
+
+# Function to advance the progress bar by the samples of a converted file.
+# The total assumes "max_samples" samples per file, so it is reduced when a file has fewer samples.
+def advance_progress(progress_bar, job, num_samples):
+    converted_samples = max(0, min(num_samples, job[4]))
+    if converted_samples < job[4]:
+        progress_bar.total -= job[4] - converted_samples
+    progress_bar.update(converted_samples)
+    acquisition = f"{job[9]}, " if job[9] is not None else ""
+    progress_bar.set_postfix_str(f"{acquisition}Board {job[1]}, Algorithm {job[2]}, Iteration {job[3]}")
+
+
+# Function to get the folder of the Multiple Files and Columnar files of an acquisition (the destination folder in single-acquisition builds)
+def acquisition_folder(acquisition):
+    return os.path.join(destination_folder, acquisition) if acquisition is not None else destination_folder
+
+
+# Function to get the configuration used to convert the file of a job, as recorded in the build manifest
+def job_config(job):
+    calibration = job[7]
+    return {
+        "fields": fields,
+        "max_samples": job[4],
+        "decimation_factor": job[5],
+        "pair_counter": job[6],
+        "decimation_method": job[10],
+        "calibration": [float(value) for value in calibration] if calibration is not None else None
+    }
+
+
+# Function to clear the screen
+def clear_screen():
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+
+def show_main_menu():
+    clear_screen()
+    print("\n***********************************")
+    print("**                               **")
+    print("**     Raw Data Builder Menu     **")
+    print("**                               **")
+    print("***********************************\n")
+    for index, option in enumerate(menu_options, start=1):
+        label = option["label"]
+        configuration = option["config_option"]
+        type = option["type"]
+        if type == "single":
+            if configuration:
+                value = configuration[0]
+                if "numeric" in option:
+                    print(f"{index}. {label} ({value})")
+                else:
+                    print(f"{index}. {label} ({value})")
+            else:
+                print(f"{index}. {label}")
+        elif type == "multiple":
+            suboptions = option["suboptions"]
+            selected_sublabels = [suboption["label"] for suboption in suboptions if suboption['selected']] 
+            if selected_sublabels:
+            
+                if(option == menu_options[1]):
+                    config_algths_option.clear()
+                    for element in selected_sublabels:
+                        # Search for matches in the current element
+                        match = re.search(pattern, element)
+                        if match:
+                            # Retrieve the found number and add it to the list
+                            number = int(match.group())
+                            config_algths_option.append(number)
+                            
+                if(option == menu_options[2]):
+                    config_boards_option.clear()
+                    for element in selected_sublabels:
+                        # Search for matches in the current element
+                        match = re.search(pattern, element)
+                        if match:
+                            # Obtain the found number and add it to the list
+                            number = int(match.group())
+                            config_boards_option.append(number)
+                   
+                sublabels_str = ", ".join(selected_sublabels)
+                print(f"{index}. {label} ({sublabels_str})")
+            else:
+                print(f"{index}. {label}")
+        elif type == "normalization":
+            current_value = "Yes" if configuration[0] else "No"
+            print(f"{index}. {label} ({current_value})")
+        elif type == "verification":
+            if all(configuration):
+                print(f"{index}. {label} (Available)")
+            else:
+                print(f"{index}. {label} (Blocked)")
+
+    print("0. Salir")
+    
+def check_option_6_available():
+    option_6 = menu_options[5]  # "Option 6" is located at position 5 in the list
+    return all(option_6["config_option"])
+
+def submenu(option):
+    current_option = menu_options[option]
+    suboptions = current_option["suboptions"]
+    type = current_option["type"]
+    numeric = current_option["numeric"]
+    
+    while True:
+        clear_screen()
+        print(f"\n{current_option['label']} Submenu")
+        print("\n--- Submenu ---\n")
+        if type == "single":
+            if numeric:
+                print("Enter a value for the Decimation Factor:")
+                print(f"Current Value: {current_option['config_option'][0]}")
+            else:
+                print("1. Unified")
+                print("2. Multiple Files")
+                print("3. Columnar")
+                print("4. Store")
+        elif type == "multiple":
+            for index, suboption in enumerate(suboptions, start=1):
+                marker = "[X]" if suboption["selected"] else "[ ]"
+                print(f"{index}. {marker} {suboption['label']}")
+        elif type == "normalization":
+            current_value = "Yes" if current_option["config_option"][0] else "No"
+            print(f"Current Value: {current_value}")
+            print("1. Yes")
+            print("2. No")
+        print("0. Back to the main menu")
+        
+        if type == "single" and numeric:
+            selection = input("\nNew value for the Decimation Factor: ")
+            if selection == "0":
+                clear_screen()
+                print("Canceling the Decimation Factor modification...")
+                break
+            elif selection.isdigit():
+                new_value = int(selection)
+                if new_value >= 1:
+                    current_option["config_option"] = [new_value]
+                else:
+                    clear_screen()
+                    print("Invalid value. It must be greater than or equal to 1. Please try again.")
+            else:
+                clear_screen()
+                print("Invalid input. It must be an integer.")
+        elif type == "single" and not numeric:
+            selection = input("\nSelect an option (1-4), 0 to go back): ")
+            if selection == "0":
+                break
+            elif selection == "1":
+                current_option["config_option"] = ["Unified"]
+                break
+            elif selection == "2":
+                current_option["config_option"] = ["Multiple Files"]
+                break
+            elif selection == "3":
+                current_option["config_option"] = ["Columnar"]
+                break
+            elif selection == "4":
+                current_option["config_option"] = ["Store"]
+                break
+            else:
+                clear_screen()
+                print("Invalid option. Please select a valid option.")
+        elif type == "normalization":
+            selection = input("\nSelect an option for T-V Normalization (1:Yes, 2:No, 0 to go back): ")
+            if selection == "0":
+                break
+            elif selection == "1":
+                current_option["config_option"] = [True]
+                break
+            elif selection == "2":
+                current_option["config_option"] = [False]
+                break
+            else:
+                clear_screen()
+                print("Invalid option. Please select 'Yes' or 'No'.")
+        else:
+            selection = input("\nSelect a Suboption: ")
+
+            if selection == "0":
+                clear_screen()
+                print("Returning to the main menu...")
+                break
+            elif selection.isdigit():
+                number_selection = int(selection)
+                if 1 <= number_selection <= len(suboptions):
+                    current_suboption = suboptions[number_selection - 1]
+                    current_suboption["selected"] = not current_suboption["selected"]
+                else:
+                    clear_screen()
+                    print("Invalid sub-option. Please select a valid sub-option.")
+            else:
+                clear_screen()
+                print("Invalid sub-option. Please select a valid sub-option.")
+
+#################################################################################################################################
+#################################################################################################################################
+
+if __name__ == "__main__":
+    while True:
+        show_main_menu()
+        main_selection = input("\nSelect an option (0-6): ")
+
+        if main_selection == "0":
+            clear_screen()
+            print("Exiting the program...")
+            break
+        elif main_selection.isdigit():
+            number_selection = int(main_selection)
+            if 1 <= number_selection <= len(menu_options):
+                if number_selection == 6:  # If selected "Option 6"
+                    if check_option_6_available():
+                        clear_screen()
+                    
+                        config_format_option = menu_options[0]["config_option"]
+                        config_decimation_option = menu_options[3]["config_option"]
+                        config_normalize_option = menu_options[4]["config_option"]
+                    
+                        print("Configuration Preview:")
+                        chain_elements = ', '.join(map(str, config_format_option))
+                        print(f"\nOutput format of the .csv file: {chain_elements}")
+                        chain_elements = None
+                    
+                        chain_elements = ', '.join(map(str, config_algths_option))
+                        print(f"Discarded Algorithms: {chain_elements}")
+                        chain_elements = None
+                    
+                        chain_elements = ', '.join(map(str, config_boards_option))
+                        print(f"Discarded Boards: {chain_elements}")
+                        chain_elements = None
+                    
+                        chain_elements = ', '.join(map(str, config_decimation_option))
+                        print(f"Decimation Factor: {chain_elements}")
+                        chain_elements = None
+                    
+                        chain_elements = ', '.join(map(str, config_normalize_option))
+                        print(f"T-V Normalization: {chain_elements}\n")
+                        chain_elements = None
+                    
+                        confirmation = input("Do you want to generate the file? (y/n): ")
+                    
+                        if confirmation.lower() == "y":
+                            operation_accepted = True             
+                            time.sleep(2)
+                            clear_screen()
+                            print("Generating File...")                      
+                            break
+                        else:
+                            clear_screen()
+                            print("Operation canceled. Returning to the main menu...")
+                            time.sleep(1)
+                    else:
+                        clear_screen()
+                        print("Option 6 is locked due to incomplete configurations.")
+                        input("Press Enter to continue...")
+                else:
+                    submenu(number_selection - 1)
+            else:
+                clear_screen()
+                print("Invalid option. Please select a valid option.")
+        else:
+            clear_screen()
+            print("Invalid option. Please select a valid option.")
+
+    #################################################################################################################################
+    #################################################################################################################################
+       
+    if(operation_accepted == True):
+        
+        # Load T-V Normalization Table if selected
+        if(config_normalize_option[0] == True):
+            # Read the CSV file into a pandas DataFrame, be careful with the path, which should contain the table name with its extension.
+            df = pd.read_csv(boards_data_table, sep = ';')
+        
+        # Report of the build, with the metrics of each stage and file
+        report = RunReport("DataBuilder", {"format": config_format_option[0], "discarded_algorithms": config_algths_option, "discarded_boards": config_boards_option,
+                                           "decimation_factor": config_decimation_option[0], "normalize": config_normalize_option[0],
+                                           "max_samples": max_samples, "parallel_workers": parallel_workers, "prefetch_files": prefetch_files, "cache_directory": cache_directory, "catalog_path": catalog_path,
+                                           "calibrate_on_read": calibrate_on_read, "acquisitions": acquisitions,
+                                           "decimation_method": decimation_method, "decimation_phase": decimation_phase})
+        
+        # List of the files to convert, in (board, algorithm, iteration) order.
+        jobs = []
+        cache = (cache_directory, cache_max_bytes) if cache_directory is not None else None
+        
+        # Calibration of each board saved along with its raw readings, when they are converted on reading instead of during the build.
+        keep_readings = calibrate_on_read and config_format_option[0] in ["Columnar", "Store"]
+        # The "mean" decimation averages the converted values, so the raw readings cannot be kept to be converted on reading.
+        if keep_readings and config_normalize_option[0] == True and decimation_method == "mean":
+            raise ValueError("calibrate_on_read cannot be used with the \"mean\" decimation method, which averages the converted values.")
+        board_calibrations = {}
+        
+        # The rows of the CSV formats are labeled with the name of their acquisition in a multi-acquisition build.
+        if acquisitions is not None and config_format_option[0] in ["Unified", "Multiple Files"]:
+            fields = fields + [acquisition_field]
+        
+        with report.measure("scan"):
+            # Source of the files of each acquisition (a single one, without name, when "acquisitions" is None). The files are read from
+            # the folders, or directly from the archives of the dataset (see ArchiveSource), and are listed from the catalog if it is given.
+            if acquisitions is not None and catalog_path is not None:
+                catalog = DatasetCatalog(catalog_path)
+                sources = {acquisition: catalog.source(acquisition) for acquisition in acquisitions}
+            elif acquisitions is not None:
+                sources = {acquisition: open_source(directory) for acquisition, directory in acquisitions.items()}
+            elif catalog_path is not None:
+                sources = {None: DatasetCatalog(catalog_path).source(catalog_acquisition)}
+            else:
+                sources = {None: open_source(base_directory)}
+            
+            # The files of all the acquisitions are added to the same list of jobs, one acquisition after another.
+            first_pair_counter = pair_counter
+            for acquisition, source in sources.items():
+                # The decimation phase starts again with each acquisition, as in a separate build of it.
+                pair_counter = first_pair_counter
+                missing_boards = []
+                
+                # Loop to iterate through the folders within the specified range.
+                for board in range(1, boards + 1):  #** Boards are scanned.
+                    # If board has been discarded, skip
+                    if board in config_boards_option:
+                        continue
+                    # Algorithms of the board with a folder in the acquisition (in the base directory or in the archive of the dataset).
+                    board_algorithms = [algorithm for algorithm in range(1, algorithms + 1)
+                                        if algorithm not in config_algths_option and source.exists(f"{board}_{algorithm}")]
+                    # Skip the boards missing from the acquisition.
+                    if not board_algorithms:
+                        missing_boards.append(board)
+                        continue
+                    if(config_normalize_option[0] == True):
+                        # Filter the DataFrame to obtain the rows where 'BOARD_NUM' matches
+                        selected_row = df[df['BOARD_NUM'] == board]
+                        if selected_row.empty:
+                            raise ValueError(f"The board {board} is not in the table '{boards_data_table}'.")
+                        # Access the values of the other columns
+                        t_cal_1 = selected_row['T_CAL_1'].values[0]
+                        t_cal_2 = selected_row['T_CAL_2'].values[0]
+                        vrefint_cal = selected_row['VREFINT_CAL'].values[0]
+                        calibration = (t_cal_1, t_cal_2, vrefint_cal)
+                    else:
+                        calibration = None
+                    if keep_readings:
+                        board_calibrations[board] = calibration
+                        calibration = None
+                
+                    for algorithm in board_algorithms:  #** Evaluated algorithms for each board are scanned.
+                        folder = f"{board}_{algorithm}"
+
+                        # Get the list of files in the current folder.
+                        files = source.listdir(folder)
+                    
+                        # Filter the files that match the format "data_Z.txt"
+                        files_data = [file for file in files if file.startswith("data_") and file.endswith(".txt")]
+                    
+                        # Sort the files using the custom function.
+                        files_data.sort(key=get_Z_number)
+                    
+                        # Iterate through the data files in the current folder.
+                        for file in files_data: #** The created files from each iteration of the evaluated algorithm on each board are processed.                                                                          
+                            iteration = get_Z_number(file)
+                            if(iteration > iterations):
+                                break
+                            complete_file = source.path(folder, file)
+                            if decimation_phase == "reset":
+                                pair_counter = 0
+                            # The offset of the first sample recorded in the catalog saves locating it again when the file is read.
+                            data_offset = source.data_offset(complete_file) if catalog_path is not None else None
+                            jobs.append((complete_file, board, algorithm, iteration, max_samples[algorithm - 1], config_decimation_option[0], pair_counter, calibration, cache,
+                                         acquisition, decimation_method, data_offset))
+                        
+                            # Each file contributes "max_samples / 2" pairs (or fewer if the catalog records fewer samples), so the decimation phase
+                            # of the next file is known before reading this one.
+                            file_samples = min(source.samples(complete_file), max_samples[algorithm - 1]) if catalog_path is not None else max_samples[algorithm - 1]
+                            pair_counter = (pair_counter + file_samples // 2) % config_decimation_option[0]
+                
+                if acquisition is not None and missing_boards:
+                    print(f"The acquisition '{acquisition}' has no files of the boards {', '.join(map(str, missing_boards))}, which are skipped.")
+        
+        # Skip the files whose output is up to date according to the build manifest.
+        if use_build_manifest and config_format_option[0] == "Multiple Files":
+            if not os.path.exists(destination_folder):
+                # If it doesn't exist, create it
+                os.makedirs(destination_folder)
+            manifest = BuildManifest(os.path.join(destination_folder, manifest_filename))
+            pending_jobs = [job for job in jobs if not manifest.is_up_to_date(
+                os.path.join(acquisition_folder(job[9]), f"{job[1]}_{job[2]}_{job[3]}.csv"), [job[0]], job_config(job))]
+            print(f"{len(jobs) - len(pending_jobs)} of {len(jobs)} files are up to date and will be skipped.")
+            jobs = pending_jobs
+        
+        # Progress Bar parametrization, in samples of the files to convert (known beforehand from the catalog)
+        if catalog_path is not None:
+            job_samples = [min(sources[job[9]].samples(job[0]), job[4]) for job in jobs]
+            total = sum(job_samples)
+        else:
+            job_samples = None
+            total = sum(job[4] for job in jobs)
+        
+        # The CSV formats receive each file as a block of CSV rows, and the columnar and store formats as voltage and temperature arrays.
+        job_function = convert_array_job if config_format_option[0] in ["Columnar", "Store"] else convert_file_job
+        
+        # Convert the files in a pool of worker processes (or one after another in this process), the results are returned in the order of "jobs".
+        parallel_workers = reading_workers([job[0] for job in jobs], parallel_workers)
+        if parallel_workers > 1:
+            pool = Pool(parallel_workers)
+            # With the samples of the files known from the catalog, the converted files waiting to be written are bounded by their samples
+            # (those of two of the largest files per worker) instead of their number, so more of the short files are converted ahead.
+            if job_samples:
+                converted_blocks = imap_bounded(pool, job_function, jobs, 2 * parallel_workers * max(max(job_samples), 1), job_samples)
+            else:
+                converted_blocks = imap_bounded(pool, job_function, jobs, 2 * parallel_workers)
+        else:
+            pool = None
+            # The next files are read by background threads while each one is converted.
+            if prefetch_files > 0:
+                converted_blocks = map(job_function, jobs, Prefetcher(prefetch_job, jobs, prefetch_files))
+            else:
+                converted_blocks = map(job_function, jobs)
+
+        if(config_format_option[0] == "Unified"):
+            # Take actions for the unified option.
+            print("... creating the unified .csv file.")
+            progress_bar_uni = tqdm(total=total, desc="Procesing", unit=" samples", unit_scale=True)
+            
+            # Write the data to the CSV file with a semicolon (;) as the delimiter, as the files are converted.
+            with open(csv_filename_unified, mode='w', newline='') as csv_file:
+                writer = csv.writer(csv_file, delimiter=';')
+                
+                # Write the column labels.
+                writer.writerow(fields)
+                
+                buffered_rows = 0
+                for job, (csv_block, num_samples, num_rows, metrics) in zip(jobs, converted_blocks):
+                    complete_file, board, algorithm, iteration = job[:4]
+                    data.append(csv_block)
+                    buffered_rows += num_rows
+                    report.add_file(complete_file, metrics, acquisition=job[9], board=board, algorithm=algorithm, iteration=iteration, num_samples=num_samples)
+                    
+                    # Write the buffered rows in a single bulk write once "chunk_size" rows have been reached.
+                    if buffered_rows >= chunk_size:
+                        with report.measure("write"):
+                            csv_file.writelines(data)
+                        report.count("write", samples=2 * buffered_rows, bytes_written=sum(map(len, data)))
+                        data.clear()
+                        buffered_rows = 0
+                    
+                    advance_progress(progress_bar_uni, job, num_samples)
+                
+                # Write the remaining rows.
+                with report.measure("write"):
+                    csv_file.writelines(data)
+                report.count("write", samples=2 * buffered_rows, bytes_written=sum(map(len, data)))
+                data.clear()
+
+            print(f"The CSV file '{csv_filename_unified}' has been successfully created.")
+            progress_bar_uni.close()
+            print("\nProcess complete")    
+
+
+        if(config_format_option[0] == "Multiple Files"):
+            # Take actions for the multiple option.
+            print("... creating the multiples .csv files.")
+            progress_bar_uni = tqdm(total=total, desc="Procesing", unit=" samples", unit_scale=True)
+            
+            for job, (csv_block, num_samples, num_rows, metrics) in zip(jobs, converted_blocks):
+                complete_file, board, algorithm, iteration = job[:4]
+                
+                csv_filename_multiple = f"{board}_{algorithm}_{iteration}.csv"
+                if not os.path.exists(acquisition_folder(job[9])):
+                    # If it doesn't exist, create it
+                    os.makedirs(acquisition_folder(job[9]))
+                csv_filename_multiple_destination = os.path.join(acquisition_folder(job[9]), csv_filename_multiple)
+                # Write the data to the CSV file with a semicolon (;) as the delimiter.
+                # A temporary file is written first, so an interrupted build never leaves an incomplete CSV file.
+                with measure(metrics, "write"):
+                    with open(csv_filename_multiple_destination + ".tmp", mode='w', newline='') as csv_file:
+                        writer = csv.writer(csv_file, delimiter=';')
+                        
+                        # Write the column labels.
+                        writer.writerow(fields)
+                        
+                        # Write the rows of the file.
+                        csv_file.write(csv_block)
+                    os.replace(csv_filename_multiple_destination + ".tmp", csv_filename_multiple_destination)
+                count(metrics, "write", samples=2 * num_rows, bytes_written=os.path.getsize(csv_filename_multiple_destination))
+                if use_build_manifest:
+                    manifest.record(csv_filename_multiple_destination, [complete_file], job_config(job), file_checksum(csv_filename_multiple_destination))
+                report.add_file(complete_file, metrics, acquisition=job[9], board=board, algorithm=algorithm, iteration=iteration, num_samples=num_samples,
+                                output=os.path.relpath(csv_filename_multiple_destination, destination_folder))
+                advance_progress(progress_bar_uni, job, num_samples)
+                            
+            progress_bar_uni.close()
+            print("\nProcess complete")    
+
+
+        if(config_format_option[0] == "Columnar"):
+            # Take actions for the columnar option, one compressed .npz file (partition) is created for each board/algorithm pair.
+            print("... creating the columnar .npz files.")
+            progress_bar_uni = tqdm(total=total, desc="Procesing", unit=" samples", unit_scale=True)
+            if not os.path.exists(destination_folder):
+                # If it doesn't exist, create it
+                os.makedirs(destination_folder)
+            
+            # Converted files of the board/algorithm pair being collected.
+            partition = None
+            partition_blocks = []
+            
+            for job, (voltage, temperature, num_samples, metrics) in zip(jobs, converted_blocks):
+                complete_file, board, algorithm, iteration = job[:4]
+                
+                # The files are ordered by acquisition, board and algorithm, so the previous partition is complete when they change.
+                if partition != (job[9], board, algorithm) and partition_blocks:
+                    npz_filename = os.path.join(acquisition_folder(partition[0]), f"{partition[1]}_{partition[2]}.npz")
+                    os.makedirs(acquisition_folder(partition[0]), exist_ok=True)
+                    with report.measure("write"):
+                        write_partition(npz_filename, fields, partition[1], partition[2], partition_blocks, board_calibrations.get(partition[1]))
+                    report.count("write", samples=2 * sum(len(block[0]) for block in partition_blocks), bytes_written=os.path.getsize(npz_filename))
+                    partition_blocks.clear()
+                    tqdm.write(f"The columnar file '{npz_filename}' has been successfully created.")
+                partition = (job[9], board, algorithm)
+                partition_blocks.append((voltage, temperature, iteration))
+                
+                report.add_file(complete_file, metrics, acquisition=job[9], board=board, algorithm=algorithm, iteration=iteration, num_samples=num_samples)
+                advance_progress(progress_bar_uni, job, num_samples)
+            
+            # Write the last partition.
+            if partition_blocks:
+                npz_filename = os.path.join(acquisition_folder(partition[0]), f"{partition[1]}_{partition[2]}.npz")
+                os.makedirs(acquisition_folder(partition[0]), exist_ok=True)
+                with report.measure("write"):
+                    write_partition(npz_filename, fields, partition[1], partition[2], partition_blocks, board_calibrations.get(partition[1]))
+                report.count("write", samples=2 * sum(len(block[0]) for block in partition_blocks), bytes_written=os.path.getsize(npz_filename))
+                partition_blocks.clear()
+                tqdm.write(f"The columnar file '{npz_filename}' has been successfully created.")
+                            
+            progress_bar_uni.close()
+            print("\nProcess complete")    
+
+
+        if(config_format_option[0] == "Store"):
+            # Take actions for the store option, the files are added to the dataset store of the destination folder.
+            store_acquisitions = [acquisition if acquisition is not None else store_acquisition for acquisition in sources]
+            print(f"... adding the acquisitions '{', '.join(store_acquisitions)}' to the dataset store.")
+            progress_bar_uni = tqdm(total=total, desc="Procesing", unit=" samples", unit_scale=True)
+            writer_acquisition = None
+            store_writer = None
+            
+            for job, (voltage, temperature, num_samples, metrics) in zip(jobs, converted_blocks):
+                complete_file, board, algorithm, iteration = job[:4]
+                # The files are ordered by acquisition, so the previous acquisition is complete (and added to the store) when it changes.
+                acquisition = job[9] if job[9] is not None else store_acquisition
+                if acquisition != writer_acquisition:
+                    if store_writer is not None:
+                        with report.measure("write"):
+                            store_writer.close()
+                        tqdm.write(f"The acquisition '{writer_acquisition}' has been successfully added to the store '{destination_folder}'.")
+                    store_writer = DatasetStoreWriter(destination_folder, fields, acquisition)
+                    writer_acquisition = acquisition
+                with measure(metrics, "write"):
+                    store_writer.append(board, algorithm, iteration, voltage, temperature, board_calibrations.get(board))
+                count(metrics, "write", samples=2 * len(voltage), bytes_written=voltage.nbytes + temperature.nbytes)
+                
+                report.add_file(complete_file, metrics, acquisition=job[9], board=board, algorithm=algorithm, iteration=iteration, num_samples=num_samples)
+                advance_progress(progress_bar_uni, job, num_samples)
+            
+            if store_writer is not None:
+                with report.measure("write"):
+                    store_writer.close()
+                print(f"The acquisition '{writer_acquisition}' has been successfully added to the store '{destination_folder}'.")
+            progress_bar_uni.close()
+            print("\nProcess complete")    
+        
+        if pool is not None:
+            pool.close()
+            pool.join()
+        
+        # Save the report of the build
+        if run_report_filename is not None:
+            report.save(run_report_filename)
+            print(f"The report of the build has been saved in '{run_report_filename}'.")
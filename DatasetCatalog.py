@@ -0,0 +1,237 @@
+import os
+import re
+import sqlite3
+import hashlib
+import argparse
+from contextlib import contextmanager
+from multiprocessing import Pool
+from ArchiveSource import ArchiveMember, open_source, open_archive, source_stat, reading_workers
+from RawParser import header_lines, footer_lines
+
+
+###########################################################
+#                                                         #
+#   Configuration for the Dataset Catalog BEGIN           #
+#                                                         #
+###########################################################
+
+# Folder with the "X_Y" folders of the dataset, or the path of its archive (.zip, .tar or .tar.gz).
+base_directory = "DiskUnit:/path/to/Data's/Folders"
+
+# Path of the catalog (SQLite database), which can hold several acquisitions.
+catalog_path = "dataset_catalog.sqlite"
+
+# Name of the acquisition of the cataloged files.
+acquisition = "ACQ1"
+
+# Number of worker processes reading the files.
+parallel_workers = 4
+
+###########################################################
+#                                                         #
+#   Configuration for the Dataset Catalog END             #
+#                                                         #
+###########################################################
+
+
+# Catalog of the "data_Z.txt" files of one or more acquisitions, stored as an SQLite database. It is built with a single scan of the
+# files (in parallel) and records, for each file, its acquisition, board, algorithm, iteration, location (path, or archive and member),
+# size, modification time, number of samples, byte offset of its first sample and SHA-256 checksum, so the scripts can plan their work
+# without listing the folders or reading the files. The files that have not changed since the last scan (same location and modification
+# time) are not read again when the catalog is updated.
+
+# Pattern of the names of the "X_Y" folders and "data_Z.txt" files
+folder_pattern = r'^(\d+)_(\d+)$'
+file_pattern = r'^data_(\d+)\.txt$'
+
+# Columns of the table of files
+catalog_schema = """CREATE TABLE IF NOT EXISTS files (
+    acquisition TEXT NOT NULL,
+    board INTEGER NOT NULL,
+    algorithm INTEGER NOT NULL,
+    iteration INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    archive TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    data_offset INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    PRIMARY KEY (acquisition, board, algorithm, iteration))"""
+
+
+# Function to read a file (or a member of an archive) entirely
+def read_source_file(file_path):
+    if isinstance(file_path, ArchiveMember):
+        return open_archive(file_path.archive_path).read(file_path.name)
+    with open(file_path, "rb") as opened_file:
+        return opened_file.read()
+
+
+# Function to scan a file (one worker task of the scan), returning its size, number of samples, offset of the first sample and checksum
+def scan_file(file_path):
+    content = read_source_file(file_path)
+    # The lines are counted as in RawParser.locate_samples, the samples being the lines between the header and the footer.
+    num_lines = content.count(b"\n") + (1 if content and not content.endswith(b"\n") else 0)
+    data_offset = 0
+    for _ in range(header_lines):
+        line_end = content.find(b"\n", data_offset)
+        data_offset = line_end + 1 if line_end >= 0 else len(content)
+    return len(content), max(num_lines - header_lines - footer_lines, 0), data_offset, hashlib.sha256(content).hexdigest()
+
+
+# Function to list the "data_Z.txt" files of a folder or archive as (board, algorithm, iteration, path) tuples
+def list_source_files(source):
+    found_files = []
+    for folder in source.listdir():
+        folder_match = re.search(folder_pattern, folder)
+        if not folder_match:
+            continue
+        board, algorithm = map(int, folder_match.groups())
+        for file_name in source.listdir(folder):
+            file_match = re.search(file_pattern, file_name)
+            if file_match:
+                found_files.append((board, algorithm, int(file_match.group(1)), source.path(folder, file_name)))
+    return sorted(found_files)
+
+
+# Context manager to connect to a catalog (creating its table if needed), committing the changes and closing the connection at the end
+@contextmanager
+def connect_catalog(catalog_path):
+    connection = sqlite3.connect(catalog_path)
+    try:
+        with connection:
+            connection.execute(catalog_schema)
+            yield connection
+    finally:
+        connection.close()
+
+
+# Function to add (or update) the files of an acquisition, found in a folder or archive, to the catalog.
+# The files that are no longer found are removed from the acquisition. Returns the number of files read.
+def build_catalog(catalog_path, directory, acquisition, workers=1):
+    source_files = list_source_files(open_source(directory))
+    with connect_catalog(catalog_path) as connection:
+        known_files = {(row[0], row[1], row[2]): row[3:] for row in connection.execute(
+            "SELECT board, algorithm, iteration, path, archive, size, mtime_ns FROM files WHERE acquisition = ?", (acquisition,))}
+
+    # Only the new and changed files are read.
+    pending_files = []
+    locations = {}
+    for board, algorithm, iteration, file_path in source_files:
+        # The paths are absolute, so the catalog can be used from any folder.
+        if isinstance(file_path, ArchiveMember):
+            path, archive = file_path.name, os.path.abspath(file_path.archive_path)
+        else:
+            path, archive = os.path.abspath(file_path), None
+        _, _, mtime_ns = source_stat(file_path)
+        locations[(board, algorithm, iteration)] = (path, archive, mtime_ns)
+        known = known_files.get((board, algorithm, iteration))
+        if known is None or known[0] != path or known[1] != archive or known[3] != mtime_ns:
+            pending_files.append((board, algorithm, iteration, file_path))
+
+    workers = reading_workers([file[3] for file in pending_files], workers)
+    if workers > 1 and len(pending_files) > 1:
+        with Pool(workers) as pool:
+            scanned = pool.map(scan_file, [file[3] for file in pending_files], chunksize=1)
+    else:
+        scanned = [scan_file(file[3]) for file in pending_files]
+
+    with connect_catalog(catalog_path) as connection:
+        for (board, algorithm, iteration, _), (size, samples, data_offset, checksum) in zip(pending_files, scanned):
+            path, archive, mtime_ns = locations[(board, algorithm, iteration)]
+            connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               (acquisition, board, algorithm, iteration, path, archive, size, mtime_ns, samples, data_offset, checksum))
+        for board, algorithm, iteration in set(known_files) - set(locations):
+            connection.execute("DELETE FROM files WHERE acquisition = ? AND board = ? AND algorithm = ? AND iteration = ?",
+                               (acquisition, board, algorithm, iteration))
+    return len(pending_files)
+
+
+# Reader of a catalog
+class DatasetCatalog:
+
+    def __init__(self, catalog_path):
+        if not os.path.exists(catalog_path):
+            raise FileNotFoundError(f"There is no dataset catalog in '{catalog_path}'.")
+        self.catalog_path = catalog_path
+
+    # Function to get the names of the acquisitions of the catalog
+    def acquisitions(self):
+        with connect_catalog(self.catalog_path) as connection:
+            return [row[0] for row in connection.execute("SELECT DISTINCT acquisition FROM files ORDER BY acquisition")]
+
+    # Function to get the files of the given acquisitions, boards, algorithms and iterations (all of them if None) as dicts with the
+    # columns of the catalog and the "file_path" to read them, in (acquisition, board, algorithm, iteration) order
+    def files(self, acquisitions=None, boards=None, algorithms=None, iterations=None):
+        conditions = []
+        parameters = []
+        for column, values in [("acquisition", acquisitions), ("board", boards), ("algorithm", algorithms), ("iteration", iterations)]:
+            if values is not None:
+                values = list(values)
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                parameters.extend(values)
+        query = "SELECT * FROM files" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+        query += " ORDER BY acquisition, board, algorithm, iteration"
+        with connect_catalog(self.catalog_path) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = [dict(row) for row in connection.execute(query, parameters)]
+        for row in rows:
+            row["file_path"] = ArchiveMember(row["archive"], row["path"]) if row["archive"] is not None else row["path"]
+        return rows
+
+    # Function to get a source of the files of an acquisition, listed from the catalog (see CatalogSource)
+    def source(self, acquisition):
+        return CatalogSource(self.files([acquisition]))
+
+
+# Source of the files of an acquisition of a catalog, with the same functions as the sources of ArchiveSource (listing the "X_Y" folders
+# and their files without touching the filesystem), and the number of samples, size and offset of the first sample of each file recorded in the catalog
+class CatalogSource:
+
+    def __init__(self, rows):
+        self.folders = {}
+        self.rows = {}
+        for row in rows:
+            self.folders.setdefault(f"{row['board']}_{row['algorithm']}", {})[f"data_{row['iteration']}.txt"] = row["file_path"]
+            self.rows[row["file_path"]] = row
+
+    def listdir(self, folder=None):
+        return list(self.folders if folder is None else self.folders.get(folder, {}))
+
+    def exists(self, folder):
+        return folder in self.folders
+
+    def path(self, folder, file_name):
+        return self.folders[folder][file_name]
+
+    # Function to get the number of samples of a file
+    def samples(self, file_path):
+        return self.rows[file_path]["samples"]
+
+    # Function to get the (uncompressed) size of a file
+    def size(self, file_path):
+        return self.rows[file_path]["size"]
+
+    # Function to get the byte offset of the first sample of a file, so its header is not searched again when it is read (see RawParser)
+    def data_offset(self, file_path):
+        return self.rows[file_path]["data_offset"]
+
+
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+
+
+if __name__ == "__main__":
+    # The options of the configuration section can be replaced from the command line
+    parser = argparse.ArgumentParser(description="Build or update the catalog of the files of an acquisition of the dataset.")
+    parser.add_argument("--source", default=base_directory, help="folder of the 'X_Y' folders, or archive of the dataset")
+    parser.add_argument("--catalog", default=catalog_path, help="path of the catalog (SQLite database)")
+    parser.add_argument("--acquisition", default=acquisition)
+    parser.add_argument("--workers", type=int, default=parallel_workers)
+    arguments = parser.parse_args()
+
+    num_scanned = build_catalog(arguments.catalog, arguments.source, arguments.acquisition, arguments.workers)
+    num_files = len(DatasetCatalog(arguments.catalog).files([arguments.acquisition]))
+    print(f"The acquisition '{arguments.acquisition}' has {num_files} files in the catalog '{arguments.catalog}' ({num_scanned} files have been read).")
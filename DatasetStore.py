@@ -0,0 +1,201 @@
+import os
+import json
+import numpy as np
+from ColumnarFormat import raw_dtype, calibrated_dtype
+from RawParser import calibrate_readings
+
+# Consolidated store of the converted files of one or more acquisitions, kept in a single folder:
+#  - "voltage.bin" and "temperature.bin": the values of all the files, one after another, as flat binary columns that are memory-mapped on reading.
+#  - "index.npy": the offsets index, with the (acquisition, board, algorithm, iteration) key and the [start, stop) rows of each file.
+#  - "store.json": the fields, the data type of the values, the names of the acquisitions, the number of rows of the store and the
+#    calibration of the boards whose raw readings are converted on reading (T-V normalized acquisitions kept as raw readings).
+# The index and the metadata are only replaced once the values of the new files have been written, so an interrupted build leaves
+# the store as it was before it started.
+
+# Data type of the entries of the offsets index ("acquisition" is the position of the acquisition in the "acquisitions" list of the metadata).
+index_dtype = np.dtype([("acquisition", np.uint8), ("board", np.uint8), ("algorithm", np.uint8), ("iteration", np.uint16),
+                        ("start", np.int64), ("stop", np.int64)])
+
+# Files of the value columns
+column_files = ["voltage.bin", "temperature.bin"]
+
+# Name of the column with the acquisition of each row, returned along with the columns of "fields" by DatasetStore.read
+acquisition_field = "Acquisition"
+
+
+# Function to write a file atomically (a temporary file is written first and then renamed)
+def replace_file(file_path, write):
+    with open(file_path + ".tmp", "wb") as opened_file:
+        write(opened_file)
+    os.replace(file_path + ".tmp", file_path)
+
+
+# Function to read the metadata and offsets index of a store, or (None, None) if the store has not been created yet
+def load_store_index(directory):
+    metadata_path = os.path.join(directory, "store.json")
+    if not os.path.exists(metadata_path):
+        return None, None
+    with open(metadata_path, "r") as metadata_file:
+        metadata = json.load(metadata_file)
+    index = np.load(os.path.join(directory, "index.npy"))
+    return metadata, index
+
+
+# Writer that adds the converted files of an acquisition to a store (creating it if it does not exist).
+# The files are appended with "append" in the order they are converted, and are added to the store when the writer is closed.
+class DatasetStoreWriter:
+
+    def __init__(self, directory, fields, acquisition):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.metadata, index = load_store_index(directory)
+        if self.metadata is None:
+            self.metadata = {"fields": fields, "value_dtype": None, "acquisitions": [], "rows": 0}
+            index = np.empty(0, dtype=index_dtype)
+        if acquisition in self.metadata["acquisitions"]:
+            raise ValueError(f"The acquisition '{acquisition}' is already in the store '{directory}'.")
+        if len(self.metadata["acquisitions"]) > np.iinfo(index_dtype["acquisition"]).max:
+            raise ValueError(f"The store '{directory}' cannot hold more acquisitions.")
+        self.metadata["acquisitions"].append(acquisition)
+        self.acquisition = len(self.metadata["acquisitions"]) - 1
+        self.entries = [index]
+        self.rows = self.metadata["rows"]
+
+        # The rows written after the last completed build (by an interrupted one) are discarded.
+        self.column_files = []
+        for column_file in column_files:
+            column_path = os.path.join(directory, column_file)
+            opened_file = open(column_path, "ab")
+            opened_file.truncate(self.rows * np.dtype(self.metadata["value_dtype"] or "u1").itemsize)
+            self.column_files.append(opened_file)
+
+    # Function to append the voltage and temperature values of a converted file.
+    # If the (t_cal_1, t_cal_2, vrefint_cal) "calibration" of the board is given, the raw readings are kept and converted on reading.
+    def append(self, board, algorithm, iteration, voltage, temperature, calibration=None):
+        # Raw ADC readings are stored in 16 bits, and converted values as float64 (as in the columnar files).
+        if self.metadata["value_dtype"] is None:
+            self.metadata["value_dtype"] = np.dtype(raw_dtype if voltage.dtype.kind in "iu" else calibrated_dtype).name
+        value_dtype = np.dtype(self.metadata["value_dtype"])
+        if (voltage.dtype.kind in "iu") != (value_dtype.kind in "iu"):
+            raise ValueError(f"The values of the store '{self.directory}' are {value_dtype.name}, so raw and converted values cannot be mixed.")
+
+        if calibration is not None:
+            if value_dtype.kind not in "iu":
+                raise ValueError(f"The values of the store '{self.directory}' are {value_dtype.name}, so they cannot be calibrated on reading.")
+            acquisition_calibration = self.metadata.setdefault("calibration", {}).setdefault(self.metadata["acquisitions"][self.acquisition], {})
+            acquisition_calibration[str(board)] = np.asarray(calibration, dtype=np.float64).tolist()
+
+        self.column_files[0].write(np.ascontiguousarray(voltage, dtype=value_dtype).tobytes())
+        self.column_files[1].write(np.ascontiguousarray(temperature, dtype=value_dtype).tobytes())
+        entry = np.array([(self.acquisition, board, algorithm, iteration, self.rows, self.rows + len(voltage))], dtype=index_dtype)
+        self.entries.append(entry)
+        self.rows += len(voltage)
+
+    # Function to add the appended files to the store
+    def close(self):
+        for opened_file in self.column_files:
+            opened_file.flush()
+            os.fsync(opened_file.fileno())
+            opened_file.close()
+        self.metadata["rows"] = self.rows
+        replace_file(os.path.join(self.directory, "index.npy"), lambda opened_file: np.save(opened_file, np.concatenate(self.entries)))
+        replace_file(os.path.join(self.directory, "store.json"), lambda opened_file: opened_file.write(json.dumps(self.metadata, indent=1).encode()))
+
+
+# Reader of a store. The value columns are memory-mapped, so the blocks returned by "block" and "query" are views of the store
+# files that are read from disk only when they are used. The raw readings of the boards with a calibration are instead converted
+# into V and ºC values of "dtype" (float32 or float64) when they are returned, unless "calibrate" is False.
+class DatasetStore:
+
+    def __init__(self, directory, calibrate=True, dtype=calibrated_dtype):
+        self.directory = directory
+        self.metadata, self.index = load_store_index(directory)
+        if self.metadata is None:
+            raise FileNotFoundError(f"There is no dataset store in '{directory}'.")
+        self.fields = self.metadata["fields"]
+        self.acquisitions = self.metadata["acquisitions"]
+
+        value_dtype = np.dtype(self.metadata["value_dtype"] or raw_dtype)
+        self.columns = {}
+        for field, column_file in zip(self.fields[:2], column_files):
+            if self.metadata["rows"] == 0:
+                self.columns[field] = np.empty(0, dtype=value_dtype)
+            else:
+                self.columns[field] = np.memmap(os.path.join(directory, column_file), dtype=value_dtype, mode="r", shape=(self.metadata["rows"],))
+
+        # Calibration of each (acquisition, board) pair converted on reading
+        self.dtype = dtype
+        self.calibration = {}
+        if calibrate:
+            for acquisition, boards in self.metadata.get("calibration", {}).items():
+                for board, calibration in boards.items():
+                    self.calibration[(acquisition, int(board))] = tuple(calibration)
+
+        # Rows of each (acquisition, board, algorithm, iteration) key
+        self.offsets = {}
+        for entry in self.index:
+            key = (self.acquisitions[entry["acquisition"]], int(entry["board"]), int(entry["algorithm"]), int(entry["iteration"]))
+            self.offsets[key] = (int(entry["start"]), int(entry["stop"]))
+
+    # Function to get the selected columns of the [start, stop) rows of a file of "board" in "acquisition" (calibrated if needed)
+    def values(self, acquisition, board, start, stop, columns):
+        values = {column: self.columns[column][start:stop] for column in columns}
+        calibration = self.calibration.get((acquisition, board))
+        if calibration is not None:
+            voltage, temperature = calibrate_readings(values.get(self.fields[0]), values.get(self.fields[1]), calibration, self.dtype)
+            for column, calibrated_values in [(self.fields[0], voltage), (self.fields[1], temperature)]:
+                if column in values:
+                    values[column] = calibrated_values
+        return values
+
+    # Function to get the values of a file as a dict of views of the selected columns (both by default)
+    def block(self, acquisition, board, algorithm, iteration, columns=None):
+        start, stop = self.offsets[(acquisition, board, algorithm, iteration)]
+        if columns is None:
+            columns = self.fields[:2]
+        return self.values(acquisition, board, start, stop, columns)
+
+    # Function to get the entries of the index that match the given acquisitions, boards, algorithms and iterations (all of them if None)
+    def select(self, acquisitions=None, boards=None, algorithms=None, iterations=None):
+        selected = np.ones(len(self.index), dtype=bool)
+        if acquisitions is not None:
+            selected &= np.isin(self.index["acquisition"], [self.acquisitions.index(acquisition) for acquisition in acquisitions])
+        for name, values in [("board", boards), ("algorithm", algorithms), ("iteration", iterations)]:
+            if values is not None:
+                selected &= np.isin(self.index[name], list(values))
+        return self.index[selected]
+
+    # Function to get the (acquisition, board, algorithm, iteration) key and the column views of each selected file
+    def query(self, acquisitions=None, boards=None, algorithms=None, iterations=None, columns=None):
+        if columns is None:
+            columns = self.fields[:2]
+        blocks = []
+        for entry in self.select(acquisitions, boards, algorithms, iterations):
+            key = (self.acquisitions[entry["acquisition"]], int(entry["board"]), int(entry["algorithm"]), int(entry["iteration"]))
+            blocks.append((key, self.values(key[0], key[1], int(entry["start"]), int(entry["stop"]), columns)))
+        return blocks
+
+    # Function to read the selected files into a dict of arrays with the value and label columns (all of them by default), as
+    # in the columnar files. Unlike "query", the values are copied into memory.
+    def read(self, acquisitions=None, boards=None, algorithms=None, iterations=None, columns=None):
+        if columns is None:
+            columns = [acquisition_field] + self.fields
+        entries = self.select(acquisitions, boards, algorithms, iterations)
+        lengths = entries["stop"] - entries["start"]
+        labels = {
+            acquisition_field: np.array(self.acquisitions)[entries["acquisition"]] if len(entries) else np.empty(0, dtype=str),
+            self.fields[2]: entries["board"],
+            self.fields[3]: entries["algorithm"],
+            self.fields[4]: entries["iteration"]
+        }
+        value_columns = [column for column in columns if column in self.columns]
+        blocks = [self.values(self.acquisitions[entry["acquisition"]], int(entry["board"]), int(entry["start"]), int(entry["stop"]), value_columns)
+                  for entry in entries]
+        result = {}
+        for column in columns:
+            if column in self.columns:
+                empty = self.columns[column][:0].astype(self.dtype) if self.calibration else self.columns[column][:0]
+                result[column] = np.concatenate([block[column] for block in blocks] or [empty])
+            else:
+                result[column] = np.repeat(labels[column], lengths)
+        return result
@@ -0,0 +1,252 @@
+import os
+import csv
+import json
+import argparse
+import pandas as pd
+from tqdm import tqdm
+from multiprocessing import Pool
+from DataBuilder import fields, max_samples, get_Z_number, imap_bounded
+from RawParser import load_raw_file, split_pairs, decimate, format_csv_block
+from ColumnarFormat import write_partition
+from DatasetStore import DatasetStoreWriter
+from ArchiveSource import open_source, reading_workers
+
+
+###########################################################
+#                                                         #
+#   Configuration for the Dataset Sweep BEGIN             #
+#                                                         #
+###########################################################
+
+# Base directory where the folders containing the data are located, or the path of the archive of the dataset (as in DataBuilder).
+base_directory = "DiskUnit:/path/to/Data's/Folders"
+
+# The address of the CSV table with the sensor calibration values for the boards (only needed by the normalized variants).
+boards_data_table = "DiskUnit:/path/to/Data/Folder/Table_UIDS.csv"
+
+# Maximum value for X, Y and Z.
+boards = 10
+algorithms = 5
+iterations = 2
+
+# Number of worker processes used to convert the files (1 converts them one after another in the main process).
+parallel_workers = 1
+
+# Folder of the cache of parsed files, as in DataBuilder (None disables the cache).
+cache_directory = None
+cache_max_bytes = 4 * 1024**3
+
+# Dataset variants to generate. Each variant has its own output format ("Unified", "Multiple Files", "Columnar" or "Store"), destination
+# folder, decimation factor, method and phase (as in DataBuilder), T-V Normalization and discarded boards and algorithms (and the acquisition
+# name of the Store format). The normalized Columnar and Store variants can keep the raw readings and the calibration of the boards
+# ("calibrate_on_read", as in DataBuilder). A list of decimation factors (e.g., [1, 2, 4, 8, 16]) generates a pyramid of variants, one per
+# factor, named "{name}_x{factor}" and written to the "x{factor}" subfolder of the destination folder. The options not given take the default values.
+variants = [
+    {"name": "raw", "format": "Multiple Files", "destination_folder": "DiskUnit:/path/to/New/Data/Folder/raw"},
+    {"name": "normalized_x2", "format": "Multiple Files", "destination_folder": "DiskUnit:/path/to/New/Data/Folder/normalized_x2",
+     "decimation_factor": 2, "normalize": True},
+    {"name": "averaged", "format": "Columnar", "destination_folder": "DiskUnit:/path/to/New/Data/Folder/averaged",
+     "decimation_factor": [2, 4, 8, 16], "decimation_method": "mean", "normalize": True}
+]
+
+###########################################################
+#                                                         #
+#   Configuration for the Dataset Sweep END               #
+#                                                         #
+###########################################################
+
+
+# Default options of the variants
+variant_defaults = {"format": "Multiple Files", "decimation_factor": 1, "decimation_method": "stride", "decimation_phase": "carry", "normalize": False,
+                    "discarded_boards": [], "discarded_algorithms": [], "acquisition": "ACQ1", "calibrate_on_read": False}
+
+# Function to expand the variants with a list of decimation factors into one variant per factor
+def expand_variants(variants):
+    expanded = []
+    for variant in variants:
+        if not isinstance(variant["decimation_factor"], list):
+            expanded.append(variant)
+            continue
+        for factor in variant["decimation_factor"]:
+            expanded.append({**variant, "name": f"{variant['name']}_x{factor}", "decimation_factor": factor,
+                             "destination_folder": os.path.join(variant["destination_folder"], f"x{factor}")})
+    return expanded
+
+# Function to list the "data_Z.txt" files as (board, algorithm, iteration, path) tuples, in (board, algorithm, iteration) order
+def list_files():
+    source = open_source(base_directory)
+    found_files = []
+    for board in range(1, boards + 1):
+        for algorithm in range(1, algorithms + 1):
+            folder = f"{board}_{algorithm}"
+            if not source.exists(folder):
+                continue
+            files_data = [file for file in source.listdir(folder) if file.startswith("data_") and file.endswith(".txt")]
+            files_data.sort(key=get_Z_number)
+            for file in files_data:
+                iteration = get_Z_number(file)
+                if(iteration > iterations):
+                    break
+                found_files.append((board, algorithm, iteration, source.path(folder, file)))
+    return found_files
+
+
+# Function to parse a "data_Z.txt" file once and convert it for every variant that includes it (one worker task of the sweep).
+# "variant_jobs" is a list of (variant index, decimation factor, pair_counter, decimation method, calibration, output format) tuples.
+def convert_sweep_job(job):
+    file_path, board, algorithm, iteration, file_max_samples, cache, variant_jobs = job
+    pairs, num_samples = load_raw_file(file_path, file_max_samples, cache)
+
+    # The raw and calibrated arrays of the whole file are computed once and shared by the variants, which decimate them with strided
+    # views or block averages (each decimation is computed once for the variants that only differ in their output format).
+    shared_arrays = {}
+    decimated_arrays = {}
+    results = []
+    for index, decimation_factor, pair_counter, decimation_method, calibration, output_format in variant_jobs:
+        if calibration not in shared_arrays:
+            shared_arrays[calibration] = split_pairs(pairs, calibration)
+        decimation = (calibration, decimation_factor, pair_counter, decimation_method)
+        if decimation not in decimated_arrays:
+            voltage, temperature = shared_arrays[calibration]
+            decimated_arrays[decimation] = (decimate(voltage, decimation_factor, pair_counter, decimation_method)[0],
+                                            decimate(temperature, decimation_factor, pair_counter, decimation_method)[0])
+        voltage, temperature = decimated_arrays[decimation]
+
+        if output_format in ["Columnar", "Store"]:
+            results.append((index, (voltage, temperature)))
+        else:
+            results.append((index, format_csv_block(voltage, temperature, board, algorithm, iteration)))
+    return results, num_samples
+
+
+# Function to write the pending partition of a Columnar variant
+def flush_partition(variant):
+    if variant["partition_blocks"]:
+        board, algorithm = variant["partition"]
+        write_partition(os.path.join(variant["destination_folder"], f"{board}_{algorithm}.npz"), fields, board, algorithm, variant["partition_blocks"],
+                        variant["calibrations"].get(board))
+        variant["partition_blocks"] = []
+
+
+# Function to read the sweep configuration from the command line (and the JSON file given with --config)
+def load_configuration():
+    parser = argparse.ArgumentParser(description="Generate several dataset variants reading each raw file only once.")
+    parser.add_argument("--config", help="JSON file with the options of the configuration section and a 'variants' list")
+    parser.add_argument("--variant", action="append", default=[], help="JSON object with the options of a variant (can be repeated)")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    arguments = parser.parse_args()
+
+    configuration = {}
+    if arguments.config:
+        with open(arguments.config, "r") as config_file:
+            configuration = json.load(config_file)
+    if arguments.variant:
+        configuration["variants"] = [json.loads(variant) for variant in arguments.variant]
+    if arguments.workers:
+        configuration["parallel_workers"] = arguments.workers
+    return configuration
+
+
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+
+
+if __name__ == "__main__":
+    # The options of the configuration section can be replaced from the command line
+    configuration = load_configuration()
+    for option in ["base_directory", "boards_data_table", "boards", "algorithms", "iterations", "parallel_workers", "cache_directory", "cache_max_bytes", "variants"]:
+        if option in configuration:
+            globals()[option] = configuration[option]
+    variants = [{**variant, "calibrations": {}} for variant in expand_variants([{**variant_defaults, **variant} for variant in variants])]
+    # The "mean" decimation averages the converted values, so the raw readings cannot be kept to be converted on reading.
+    for variant in variants:
+        if (variant["normalize"] and variant["calibrate_on_read"] and variant["format"] in ["Columnar", "Store"]
+                and variant["decimation_method"] == "mean"):
+            raise ValueError(f"The variant '{variant['name']}' cannot use calibrate_on_read with the \"mean\" decimation method, which averages the converted values.")
+    cache = (cache_directory, cache_max_bytes) if cache_directory is not None else None
+
+    # Load T-V Normalization Table if any variant needs it
+    if any(variant["normalize"] for variant in variants):
+        df = pd.read_csv(boards_data_table, sep = ';')
+
+    # Plan the conversion of each file for all the variants that include it, along with the decimation phase of each variant.
+    pair_counters = [0] * len(variants)
+    jobs = []
+    for board, algorithm, iteration, file_path in list_files():
+        variant_jobs = []
+        for index, variant in enumerate(variants):
+            if board in variant["discarded_boards"] or algorithm in variant["discarded_algorithms"]:
+                continue
+            calibration = None
+            if variant["normalize"]:
+                selected_row = df[df['BOARD_NUM'] == board]
+                calibration = (selected_row['T_CAL_1'].values[0], selected_row['T_CAL_2'].values[0], selected_row['VREFINT_CAL'].values[0])
+                # The raw readings are kept and the calibration of the board is saved with them
+                if variant["calibrate_on_read"] and variant["format"] in ["Columnar", "Store"]:
+                    variant["calibrations"][board] = calibration
+                    calibration = None
+            if variant["decimation_phase"] == "reset":
+                pair_counters[index] = 0
+            variant_jobs.append((index, variant["decimation_factor"], pair_counters[index], variant["decimation_method"], calibration, variant["format"]))
+            # The phase of the next file assumes "max_samples" samples per file, as DataBuilder does without a catalog.
+            pair_counters[index] = (pair_counters[index] + max_samples[algorithm - 1] // 2) % variant["decimation_factor"]
+        if variant_jobs:
+            jobs.append((file_path, board, algorithm, iteration, max_samples[algorithm - 1], cache, variant_jobs))
+
+    # Prepare the outputs of the variants
+    for variant in variants:
+        os.makedirs(variant["destination_folder"], exist_ok=True)
+        if variant["format"] == "Unified":
+            csv_filename_unified = f"raw_dataset_{boards}_{algorithms}_{iterations}.csv"
+            variant["csv_file"] = open(os.path.join(variant["destination_folder"], csv_filename_unified), mode='w', newline='')
+            csv.writer(variant["csv_file"], delimiter=';').writerow(fields)
+        elif variant["format"] == "Columnar":
+            variant["partition"] = None
+            variant["partition_blocks"] = []
+        elif variant["format"] == "Store":
+            variant["store_writer"] = DatasetStoreWriter(variant["destination_folder"], fields, variant["acquisition"])
+
+    print(f"... generating {len(variants)} variants from {len(jobs)} files.")
+    parallel_workers = reading_workers([job[0] for job in jobs], parallel_workers)
+    if parallel_workers > 1:
+        pool = Pool(parallel_workers)
+        converted_files = imap_bounded(pool, convert_sweep_job, jobs, 2 * parallel_workers)
+    else:
+        pool = None
+        converted_files = map(convert_sweep_job, jobs)
+
+    for job, (results, num_samples) in tqdm(zip(jobs, converted_files), total=len(jobs), desc="Procesing"):
+        file_path, board, algorithm, iteration = job[:4]
+        for index, converted_block in results:
+            variant = variants[index]
+            if variant["format"] == "Unified":
+                variant["csv_file"].write(converted_block)
+            elif variant["format"] == "Multiple Files":
+                csv_filename_multiple_destination = os.path.join(variant["destination_folder"], f"{board}_{algorithm}_{iteration}.csv")
+                with open(csv_filename_multiple_destination + ".tmp", mode='w', newline='') as csv_file:
+                    csv.writer(csv_file, delimiter=';').writerow(fields)
+                    csv_file.write(converted_block)
+                os.replace(csv_filename_multiple_destination + ".tmp", csv_filename_multiple_destination)
+            elif variant["format"] == "Columnar":
+                # The files are ordered by board and algorithm, so the previous partition is complete when the pair changes.
+                if variant["partition"] != (board, algorithm):
+                    flush_partition(variant)
+                    variant["partition"] = (board, algorithm)
+                variant["partition_blocks"].append((converted_block[0], converted_block[1], iteration))
+            elif variant["format"] == "Store":
+                variant["store_writer"].append(board, algorithm, iteration, converted_block[0], converted_block[1], variant["calibrations"].get(board))
+
+    for variant in variants:
+        if variant["format"] == "Unified":
+            variant["csv_file"].close()
+        elif variant["format"] == "Columnar":
+            flush_partition(variant)
+        elif variant["format"] == "Store":
+            variant["store_writer"].close()
+        print(f"The variant '{variant['name']}' has been successfully created in '{variant['destination_folder']}'.")
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+    print("\nProcess complete")
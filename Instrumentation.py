@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Instrumentation of the stages of the scripts (scan, read, parse, calibrate, decimate, write, sequence, normalize, HDF5 write).
+# The metrics of a file (or of a whole run) are kept in a dict with one entry per stage, holding its number of calls, wall and
+# CPU time, bytes read and written, samples processed and peak memory. They are plain dicts, so the worker processes can return
+# them along with their results and the main process merges them into the run report.
+
+# Function to create empty metrics
+def new_metrics():
+    return {}
+
+# Function to get the metrics of a stage, creating them the first time the stage is measured
+def stage_metrics(metrics, stage):
+    if stage not in metrics:
+        metrics[stage] = {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "bytes_read": 0, "bytes_written": 0, "samples": 0, "peak_memory_bytes": 0}
+    return metrics[stage]
+
+# Function to get the peak resident memory of this process since it started in bytes (None if it cannot be measured, e.g., on Windows)
+def process_peak_memory():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in kilobytes on Linux.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+# Function to get the peak resident memory of this process in bytes.
+# On Linux, it is the peak since the last call to "reset_peak_memory", so each stage reports its own peak.
+def peak_memory():
+    try:
+        with open("/proc/self/status", "r") as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return process_peak_memory()
+
+# Function to reset the peak resident memory of this process to its current value (only possible on Linux)
+def reset_peak_memory():
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs_file:
+            clear_refs_file.write("5")
+    except OSError:
+        pass
+
+# Context manager to measure the wall time, CPU time and peak memory of a stage into "metrics" (nothing is measured if "metrics" is None).
+# The CPU time is that of the thread running the stage, so the stages run in background threads (see Prefetcher) are measured apart.
+# The peak memory is that of the whole process: only the main thread resets it, as a reset from a background thread would also
+# reset the peak of the stage running in the main thread, so the stages of the background threads report the peak of the process
+# since the last reset. While background threads run, the peak of a stage includes their memory and is only approximate.
+@contextmanager
+def measure(metrics, stage):
+    if metrics is None:
+        yield
+        return
+    if threading.current_thread() is threading.main_thread():
+        reset_peak_memory()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        measured = stage_metrics(metrics, stage)
+        measured["calls"] += 1
+        measured["wall_seconds"] += time.perf_counter() - wall_start
+        measured["cpu_seconds"] += time.thread_time() - cpu_start
+        measured["peak_memory_bytes"] = max(measured["peak_memory_bytes"], peak_memory() or 0)
+
+# Function to add the bytes and samples processed by a stage to "metrics" (nothing is added if "metrics" is None)
+def count(metrics, stage, samples=0, bytes_read=0, bytes_written=0):
+    if metrics is None:
+        return
+    measured = stage_metrics(metrics, stage)
+    measured["samples"] += samples
+    measured["bytes_read"] += bytes_read
+    measured["bytes_written"] += bytes_written
+
+# Function to add "other" metrics to "metrics"
+def merge_metrics(metrics, other):
+    for stage, other_stage in other.items():
+        measured = stage_metrics(metrics, stage)
+        for key, value in other_stage.items():
+            measured[key] = max(measured[key], value) if key == "peak_memory_bytes" else measured[key] + value
+
+
+# Report of a run of a script: the configuration, the totals of each stage, the metrics of each file and the overall
+# wall time, CPU time and peak memory, saved as a JSON file.
+class RunReport:
+
+    def __init__(self, script, config):
+        self.script = script
+        self.config = config
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.wall_start, self.cpu_start = time.perf_counter(), time.process_time()
+        self.stages = new_metrics()
+        self.files = []
+
+    # Function to add the metrics of a stage measured in this process (outside of the files)
+    @contextmanager
+    def measure(self, stage):
+        with measure(self.stages, stage):
+            yield
+
+    # Function to add the bytes and samples processed by a stage measured in this process
+    def count(self, stage, samples=0, bytes_read=0, bytes_written=0):
+        count(self.stages, stage, samples, bytes_read, bytes_written)
+
+    # Function to add the metrics of a file (measured in this or in a worker process), along with its labels
+    def add_file(self, file_path, metrics, **labels):
+        merge_metrics(self.stages, metrics)
+        self.files.append({"file": str(file_path), **labels, "stages": metrics})
+
+    # Function to save the report as a JSON file
+    def save(self, file_path):
+        # The CPU time of the worker processes is included in the stages, and not in the CPU time of this process.
+        report = {
+            "script": self.script,
+            "started": self.started,
+            "config": self.config,
+            "wall_seconds": time.perf_counter() - self.wall_start,
+            "main_cpu_seconds": time.process_time() - self.cpu_start,
+            "main_peak_memory_bytes": process_peak_memory(),
+            "stages": self.stages,
+            "files": self.files
+        }
+        with open(file_path + ".tmp", "w") as report_file:
+            json.dump(report, report_file, indent=1, default=str)
+        os.replace(file_path + ".tmp", file_path)
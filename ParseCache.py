@@ -0,0 +1,103 @@
+import os
+import hashlib
+import numpy as np
+from ArchiveSource import source_stat
+
+# Cache of parsed "data_Z.txt" files, stored as .npy arrays of [temperature, voltage] ADC pairs that are memory-mapped on reading.
+# Each entry is keyed by the path, size, modification time and "max_samples" truncation of the raw file, so any change in the
+# raw file (or in the truncation) invalidates it. When the cache grows over "max_bytes", the least recently used entries are removed.
+class ParseCache:
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = None
+        self.total_bytes = 0
+
+    # Function to compute the key of the entry of a raw file (or of a member of an archive, see ArchiveSource)
+    def key(self, file_path, max_samples):
+        path, size, mtime_ns = source_stat(file_path)
+        identity = f"{path}|{size}|{mtime_ns}|{max_samples}"
+        return hashlib.sha1(identity.encode()).hexdigest()
+
+    # Function to scan the cache folder once, the entry files are named "{key}_{num_samples}.npy"
+    def load_entries(self):
+        if self.entries is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.entries = {}
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".npy") and "_" in entry.name:
+                    self.entries[entry.name.split("_")[0]] = entry.name
+                    self.total_bytes += entry.stat().st_size
+        return self.entries
+
+    # Function to get the cached pairs and number of samples of a raw file, or (None, None) if it is not cached
+    def load(self, file_path, max_samples):
+        entry_name = self.load_entries().get(self.key(file_path, max_samples))
+        if entry_name is None:
+            return None, None
+        entry_path = os.path.join(self.directory, entry_name)
+        try:
+            pairs = np.load(entry_path, mmap_mode="r")
+            # Mark the entry as recently used.
+            os.utime(entry_path)
+        except (FileNotFoundError, ValueError):
+            # The entry has been evicted (or is incomplete), so the file must be parsed again.
+            return None, None
+        num_samples = int(entry_name[:-len(".npy")].split("_")[1])
+        return pairs, num_samples
+
+    # Function to add the parsed pairs of a raw file to the cache
+    def store(self, file_path, max_samples, pairs, num_samples):
+        key = self.key(file_path, max_samples)
+        entries = self.load_entries()
+        entry_name = f"{key}_{num_samples}.npy"
+
+        # ADC readings fit in 16 bits, which keeps the cache four times smaller than the parsed int64 arrays.
+        if len(pairs) == 0 or (pairs.min() >= 0 and pairs.max() <= np.iinfo(np.uint16).max):
+            pairs = pairs.astype(np.uint16)
+
+        # Write to a temporary file first, so other processes never see a partially written entry.
+        temporary_path = os.path.join(self.directory, f"{key}.{os.getpid()}.tmp")
+        with open(temporary_path, "wb") as entry_file:
+            np.save(entry_file, pairs)
+        entry_path = os.path.join(self.directory, entry_name)
+        os.replace(temporary_path, entry_path)
+        entries[key] = entry_name
+        self.total_bytes += os.path.getsize(entry_path)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    # Function to remove the least recently used entries until the cache size is under "max_bytes".
+    # The folder is scanned again to account for the entries added by other processes.
+    def evict(self):
+        files = []
+        self.total_bytes = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Removed by another process
+                files.append((stat.st_mtime_ns, stat.st_size, entry.name))
+                self.total_bytes += stat.st_size
+
+        for _, size, name in sorted(files):
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass  # Already removed by another process
+            self.total_bytes -= size
+            self.entries.pop(name.split("_")[0], None)
+
+
+# Caches opened in this process, so that the cache folder is only scanned once by each worker process.
+open_caches = {}
+
+# Function to get the cache of "directory", opening it the first time it is used in this process
+def open_cache(directory, max_bytes):
+    if (directory, max_bytes) not in open_caches:
+        open_caches[(directory, max_bytes)] = ParseCache(directory, max_bytes)
+    return open_caches[(directory, max_bytes)]
@@ -0,0 +1,32 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Reader that applies "function" to the ordered "items" (e.g., reads the input files of a build) in background threads ahead of their
+# use, so the reads of the next files overlap with the processing of the current one. It yields the results in the order of "items",
+# and only "depth" items are read ahead at any time (besides the one being used), which bounds the memory of the buffered results
+# (with depth=1 the next file is read while the current one is processed, as in double buffering). An error reading an item is
+# raised when its result is reached.
+class Prefetcher:
+
+    def __init__(self, function, items, depth=2, workers=None):
+        self.function = function
+        self.items = items
+        self.depth = max(depth, 1)
+        # One thread per buffered item by default, so the latency of the reads also overlaps between them (e.g., on network shares).
+        self.workers = workers if workers is not None else self.depth
+
+    def __iter__(self):
+        items = iter(self.items)
+        with ThreadPoolExecutor(self.workers) as executor:
+            pending = deque()
+            for item in items:
+                pending.append(executor.submit(self.function, item))
+                if len(pending) >= self.depth:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                # The next read is submitted before the current result is used, keeping "depth" items in flight.
+                for item in items:
+                    pending.append(executor.submit(self.function, item))
+                    break
+                yield result
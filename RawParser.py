@@ -0,0 +1,276 @@
+import os
+import csv
+import io
+import mmap
+from itertools import repeat
+import numpy as np
+from ParseCache import open_cache
+from ArchiveSource import ArchiveMember, open_archive
+from Instrumentation import new_metrics, measure, count, merge_metrics
+
+# Number of header lines at the beginning of each "data_Z.txt" file (samples start on the 5th line).
+header_lines = 4
+
+# Number of footer lines at the end of each "data_Z.txt" file.
+footer_lines = 2
+
+# Size of the blocks of a raw file in which the line breaks are searched.
+scan_block_bytes = 64 * 1024
+
+# Function to parse a "data_Z.txt" file into an (N, 2) integer array of [temperature, voltage] ADC pairs.
+# The file is memory-mapped and only read up to the "max_samples" truncation boundary: the bytes of the samples are located
+# without splitting the file into lines and converted as a single array operation.
+# "metrics" are the instrumentation metrics of the file (see Instrumentation), or None to not measure it.
+# "prefetched" are the samples of the file already read by "prefetch_raw_file", or None to read them.
+# "data_offset" is the byte offset of the first sample of the file recorded in the catalog (see DatasetCatalog), or None to locate it.
+def parse_raw_file(file_path, max_samples, metrics=None, prefetched=None, data_offset=None):
+    if prefetched is None:
+        samples_block, num_samples = read_raw_samples(file_path, max_samples, metrics, data_offset)
+    else:
+        samples_block, num_samples, read_metrics = prefetched
+        if metrics is not None:
+            merge_metrics(metrics, read_metrics)
+
+    with measure(metrics, "parse"):
+        pairs = parse_samples(samples_block)
+    count(metrics, "parse", samples=pairs.size)
+    return pairs, num_samples
+
+
+# Function to read the bytes of the first "max_samples" samples of a "data_Z.txt" file, returning them along with the number of
+# samples of the file (see locate_samples). The members of an archive (see ArchiveSource) are decompressed up to those samples.
+def read_raw_samples(file_path, max_samples, metrics=None, data_offset=None):
+    if isinstance(file_path, ArchiveMember):
+        with measure(metrics, "read"):
+            content = open_archive(file_path.archive_path).read(file_path.name, header_lines + max(max_samples, 0) + footer_lines)
+            start, end, num_samples = locate_samples(content, max_samples, data_offset)
+            samples_block = content[start:end]
+        count(metrics, "read", bytes_read=len(content))
+        return samples_block, num_samples
+
+    with open(file_path, "rb") as opened_file:
+        # Empty files cannot be memory-mapped.
+        if os.fstat(opened_file.fileno()).st_size == 0:
+            mapped_file = None
+            content = b""
+        else:
+            mapped_file = mmap.mmap(opened_file.fileno(), 0, access=mmap.ACCESS_READ)
+            content = mapped_file
+        try:
+            with measure(metrics, "read"):
+                start, end, num_samples = locate_samples(content, max_samples, data_offset)
+                # Only the bytes of the samples are copied out of the file.
+                samples_block = content[start:end]
+            count(metrics, "read", bytes_read=end)
+        finally:
+            if mapped_file is not None:
+                mapped_file.close()
+    return samples_block, num_samples
+
+
+# Function to read the samples of a "data_Z.txt" file ahead of its parsing (e.g., in a background thread of a Prefetcher),
+# returning them along with the metrics of the read to pass them to "parse_raw_file".
+def prefetch_raw_file(file_path, max_samples, data_offset=None):
+    metrics = new_metrics()
+    samples_block, num_samples = read_raw_samples(file_path, max_samples, metrics, data_offset)
+    return samples_block, num_samples, metrics
+
+
+# Function to locate the samples of the content of a "data_Z.txt" file (bytes or a memory-mapped file), returning the [start, end)
+# byte range of its first "max_samples" samples and the number of samples of the file (or "max_samples" if it has more).
+# The line breaks are searched block by block, so the content past the truncation boundary is not read. If the offset of the first
+# sample is known ("data_offset", recorded in the catalog), the search starts there and the header is not read.
+def locate_samples(content, max_samples, data_offset=None):
+    # The file has at least "max_samples" samples once the lines of its header, those samples and its footer have been found.
+    needed_lines = header_lines + max(max_samples, 0) + footer_lines
+    if data_offset is None:
+        line_ends = []
+        scan_start = 0
+    else:
+        # Only the end of the last line of the header (just before the first sample) is used.
+        line_ends = [np.full(header_lines, data_offset - 1, dtype=np.int64)]
+        scan_start = data_offset
+    found_lines = sum(len(block_ends) for block_ends in line_ends)
+    for block_start in range(scan_start, len(content), scan_block_bytes):
+        block = np.frombuffer(content, dtype=np.uint8, count=min(scan_block_bytes, len(content) - block_start), offset=block_start)
+        line_ends.append(np.flatnonzero(block == ord("\n")) + block_start)
+        found_lines += len(line_ends[-1])
+        if found_lines >= needed_lines:
+            break
+    line_ends = np.concatenate(line_ends) if line_ends else np.empty(0, dtype=np.int64)
+
+    if len(line_ends) >= needed_lines:
+        num_lines = needed_lines
+        num_samples = max_samples
+    else:
+        num_lines = len(line_ends) + (1 if len(content) and content[-1] != ord("\n") else 0)
+        num_samples = num_lines - header_lines - footer_lines
+
+    if num_samples <= 0:
+        return 0, 0, num_samples
+
+    # The samples end at "max_samples" or at the footer of the file, whichever comes first.
+    start = int(line_ends[header_lines - 1]) + 1
+    last_line = min(header_lines + max_samples, num_lines - footer_lines) - 1
+    end = int(line_ends[last_line]) + 1 if last_line < len(line_ends) else len(content)
+    return start, end, num_samples
+
+
+# Function to convert the bytes of the samples of a "data_Z.txt" file into [temperature, voltage] pairs
+def parse_samples(samples_block):
+    # Convert the whole block of lines at once (any whitespace, including "\r\n", acts as separator).
+    values = np.fromstring(samples_block, dtype=np.int64, sep=" ") if samples_block else np.empty(0, dtype=np.int64)
+
+    # Even lines are temperature and odd lines are voltage, so each row of the reshaped array is a T-V pair.
+    return values[:len(values) // 2 * 2].reshape(-1, 2)
+
+
+# Function to parse the content of a "data_Z.txt" file already in memory (see parse_raw_file)
+def parse_raw_content(content, max_samples):
+    start, end, num_samples = locate_samples(content, max_samples)
+    return parse_samples(content[start:end]), num_samples
+
+
+# Function to convert voltage ADC readings into volts using the VREFINT_CAL value of the board.
+def calibrate_voltage(voltage, vrefint_cal):
+    return 3 * (vrefint_cal / voltage)
+
+
+# Function to convert temperature ADC readings into degrees Celsius using the T_CAL_1 and T_CAL_2 values of the board.
+def calibrate_temperature(temperature, t_cal_1, t_cal_2):
+    return ((80 / (t_cal_2 - t_cal_1)) * (temperature - t_cal_1)) + 30
+
+
+# Function to convert raw voltage and temperature ADC readings (e.g., stored as 16-bit integers) into V and ºC values of "dtype"
+# (float32 or float64), for the files that keep the readings and the calibration of their board instead of the converted values.
+# "calibration" is a (t_cal_1, t_cal_2, vrefint_cal) tuple, and either reading can be None when only the other one is needed.
+# The float64 values are the same as those of "split_pairs".
+def calibrate_readings(voltage, temperature, calibration, dtype=np.float64):
+    dtype = np.dtype(dtype).type
+    t_cal_1, t_cal_2, vrefint_cal = (dtype(value) for value in calibration)
+    if voltage is not None:
+        voltage = calibrate_voltage(np.asarray(voltage, dtype=dtype), vrefint_cal).astype(dtype, copy=False)
+    if temperature is not None:
+        temperature = calibrate_temperature(np.asarray(temperature, dtype=dtype), t_cal_1, t_cal_2).astype(dtype, copy=False)
+    return voltage, temperature
+
+
+# Function to decimate an array of pairs (or values) by "factor": "stride" keeps one out of every "factor" pairs (a view of the array),
+# and "mean" averages each block of "factor" consecutive pairs into one (as float64). The blocks start at the kept pairs of "stride",
+# and the incomplete blocks at the beginning (whose first pairs belong to the previous file) and at the end are discarded.
+# "pair_counter" is the decimation phase carried over from the previous file (0 starts the file at a new block), the updated phase is returned.
+def decimate(pairs, factor, pair_counter, method="stride"):
+    first = (-pair_counter) % factor
+    next_pair_counter = (pair_counter + len(pairs)) % factor
+    if method == "stride":
+        return pairs[first::factor], next_pair_counter
+    if method != "mean":
+        raise ValueError(f"Unknown decimation method '{method}' (it must be 'stride' or 'mean').")
+    if factor == 1:
+        return pairs, next_pair_counter
+    num_blocks = max(len(pairs) - first, 0) // factor
+    blocks = pairs[first:first + num_blocks * factor].reshape(num_blocks, factor, *pairs.shape[1:])
+    return blocks.mean(axis=1), next_pair_counter
+
+
+
+# Function to get the [temperature, voltage] pairs of a "data_Z.txt" file, from the cache of parsed files if possible.
+# "cache" is a (directory, max_bytes) tuple to reuse the parsed files of previous runs (see ParseCache), or None to always parse them.
+def load_raw_file(file_path, max_samples, cache=None, metrics=None, prefetched=None, data_offset=None):
+    pairs = None
+    if cache is not None:
+        parse_cache = open_cache(*cache)
+        with measure(metrics, "read"):
+            pairs, num_samples = parse_cache.load(file_path, max_samples)
+        if pairs is not None:
+            count(metrics, "read", bytes_read=pairs.nbytes, samples=pairs.size)
+    if pairs is None:
+        pairs, num_samples = parse_raw_file(file_path, max_samples, metrics, prefetched, data_offset)
+        if cache is not None:
+            with measure(metrics, "write"):
+                parse_cache.store(file_path, max_samples, pairs, num_samples)
+    return pairs, num_samples
+
+
+# Function to split (N, 2) pairs into voltage and temperature arrays, converting them to V and ºC if "calibration" is given.
+# "calibration" is a (t_cal_1, t_cal_2, vrefint_cal) tuple, or None to keep the raw ADC values.
+def split_pairs(pairs, calibration=None, metrics=None):
+    with measure(metrics, "calibrate"):
+        # Cached pairs are stored as 16-bit integers, the conversions are always done on 64-bit integers.
+        pairs = pairs.astype(np.int64, copy=False)
+
+        temperature = pairs[:, 0]
+        voltage = pairs[:, 1]
+        if calibration is not None:
+            t_cal_1, t_cal_2, vrefint_cal = calibration
+            voltage = calibrate_voltage(voltage, vrefint_cal)
+            temperature = calibrate_temperature(temperature, t_cal_1, t_cal_2)
+    count(metrics, "calibrate", samples=pairs.size)
+    return voltage, temperature
+
+
+# Function to parse, decimate and (optionally) calibrate a "data_Z.txt" file.
+# With the "mean" decimation method, the blocks of converted values are averaged (the conversion of the voltage is not linear),
+# so all the pairs are converted before the decimation.
+def convert_raw_file(file_path, max_samples, decimation_factor, pair_counter, calibration=None, cache=None, metrics=None, prefetched=None,
+                     decimation_method="stride", data_offset=None):
+    pairs, num_samples = load_raw_file(file_path, max_samples, cache, metrics, prefetched, data_offset)
+    if decimation_method == "mean":
+        voltage, temperature = split_pairs(pairs, calibration, metrics)
+        with measure(metrics, "decimate"):
+            voltage, _ = decimate(voltage, decimation_factor, pair_counter, decimation_method)
+            temperature, pair_counter = decimate(temperature, decimation_factor, pair_counter, decimation_method)
+        count(metrics, "decimate", samples=pairs.size)
+        return voltage, temperature, pair_counter, num_samples
+    with measure(metrics, "decimate"):
+        decimated_pairs, pair_counter = decimate(pairs, decimation_factor, pair_counter, decimation_method)
+    count(metrics, "decimate", samples=pairs.size)
+    voltage, temperature = split_pairs(decimated_pairs, calibration, metrics)
+    return voltage, temperature, pair_counter, num_samples
+
+
+# Function to format voltage and temperature arrays as a block of semicolon-delimited CSV rows with the labels of their file.
+# The name of the "acquisition" of the file is added as the last column if it is given.
+def format_csv_block(voltage, temperature, board, algorithm, iteration, acquisition=None):
+    csv_block = io.StringIO()
+    writer = csv.writer(csv_block, delimiter=';')
+    labels = [repeat(board), repeat(algorithm), repeat(iteration)] + ([repeat(acquisition)] if acquisition is not None else [])
+    writer.writerows(zip(voltage.tolist(), temperature.tolist(), *labels))
+    return csv_block.getvalue()
+
+
+# Function to convert a "data_Z.txt" file into a block of semicolon-delimited CSV rows (one worker task of the build).
+# "job" is a (file_path, board, algorithm, iteration, max_samples, decimation_factor, pair_counter, calibration, cache, acquisition,
+# decimation_method, data_offset) tuple, where "acquisition" is the name of the acquisition of the file in a multi-acquisition build (None
+# otherwise), "decimation_method" is "stride" or "mean" (see decimate) and "data_offset" is the offset of the first sample of the file
+# recorded in the catalog (None if it is not listed from a catalog).
+# The instrumentation metrics of the file are returned along with the results. "prefetched" are the samples of the file read
+# ahead by "prefetch_job", or None to read them.
+def convert_file_job(job, prefetched=None):
+    file_path, board, algorithm, iteration, max_samples, decimation_factor, pair_counter, calibration, cache, acquisition, decimation_method, data_offset = job
+    metrics = new_metrics()
+    voltage, temperature, _, num_samples = convert_raw_file(file_path, max_samples, decimation_factor, pair_counter, calibration, cache, metrics, prefetched,
+                                                            decimation_method, data_offset)
+    with measure(metrics, "format"):
+        csv_block = format_csv_block(voltage, temperature, board, algorithm, iteration, acquisition)
+    count(metrics, "format", samples=2 * len(voltage))
+    return csv_block, num_samples, len(voltage), metrics
+
+
+# Function to convert a "data_Z.txt" file into voltage and temperature arrays (one worker task of the columnar build).
+# "job" and "prefetched" have the same format as in "convert_file_job".
+def convert_array_job(job, prefetched=None):
+    file_path, board, algorithm, iteration, max_samples, decimation_factor, pair_counter, calibration, cache, acquisition, decimation_method, data_offset = job
+    metrics = new_metrics()
+    voltage, temperature, _, num_samples = convert_raw_file(file_path, max_samples, decimation_factor, pair_counter, calibration, cache, metrics, prefetched,
+                                                            decimation_method, data_offset)
+    return voltage, temperature, num_samples, metrics
+
+
+# Function to read the samples of the file of a job ahead of its conversion (see prefetch_raw_file).
+# The files of the parse cache are not read ahead (None), as they are loaded from the cache instead of being parsed.
+def prefetch_job(job):
+    file_path, max_samples, cache, data_offset = job[0], job[4], job[8], job[11]
+    if cache is not None:
+        return None
+    return prefetch_raw_file(file_path, max_samples, data_offset)
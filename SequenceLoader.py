@@ -0,0 +1,208 @@
+import os
+import re
+import queue
+import threading
+import numpy as np
+import h5py
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import hdf5plugin  # Registers the "lz4" filter of the files generated with hdf5_compression = "lz4"
+except ImportError:
+    hdf5plugin = None
+
+# Function to list the "board_{board}_sequences.h5" files generated by Sequencer in a folder, in board order
+def sequence_files(folder):
+    pattern = re.compile(r'board_(\d+)_sequences\.h5$')
+    found_files = []
+    for file_name in os.listdir(folder):
+        match = pattern.match(file_name)
+        if match:
+            found_files.append((int(match.group(1)), os.path.join(folder, file_name)))
+    return [file_path for _, file_path in sorted(found_files)]
+
+
+# Function to get the Z-score normalization parameters (mean, std) of the "sequences" dataset of a file generated by Sequencer, or None
+# if its sequences do not have to be normalized on reading. The statistics computed by Sequencer are saved as attributes ("normalized"
+# is False) and the sequences are stored without normalizing, while the sequences normalized with fixed statistics are stored normalized.
+def normalization_parameters(dataset):
+    attributes = dataset.attrs
+    if "mean" not in attributes or attributes.get("normalized", False):
+        return None
+    return np.asarray(attributes["mean"], dtype=np.float64), np.asarray(attributes["std"], dtype=np.float64)
+
+# Function to normalize the sequences read from a file with its normalization parameters (None keeps them), in their data type
+def normalize_sequences(sequences, parameters):
+    if parameters is None:
+        return sequences
+    mean, std = parameters
+    return ((sequences.astype(np.float64) - mean) / std).astype(sequences.dtype)
+
+
+# Loader of shuffled batches of (sequences, board labels) from the HDF5 files generated by Sequencer.
+# The sequences are always read one whole HDF5 chunk at a time: every epoch the chunks of all the files are shuffled, and the
+# sequences of each group of "shuffle_chunks" chunks are shuffled together into batches, so the batches mix the boards without
+# reading single sequences. The chunks are read ahead by a pool of "workers" background threads and up to "prefetch_batches" batches
+# are kept ready, while the most recently read chunks are kept in memory up to "cache_max_bytes" (a dataset that fits in the cache
+# is only read from disk in the first epoch). "iterations" selects the sequences of some iterations only (e.g., the training ones).
+# The sequences stored without normalizing are normalized with the statistics saved in their file as they are read ("normalize").
+class SequenceLoader:
+
+    def __init__(self, file_paths, batch_size=256, shuffle=True, shuffle_chunks=8, iterations=None, workers=4, prefetch_batches=4,
+                 cache_max_bytes=1024**3, drop_last=False, seed=None, normalize=True):
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.shuffle_chunks = shuffle_chunks
+        self.workers = workers
+        self.prefetch_batches = prefetch_batches
+        self.cache_max_bytes = cache_max_bytes
+        self.drop_last = drop_last
+        self.rng = np.random.default_rng(seed)
+
+        # Chunks of the files as (file index, start, stop) tuples, along with the selected sequences of the partially selected chunks
+        self.files = [h5py.File(file_path, "r") for file_path in file_paths]
+        self.normalizations = [normalization_parameters(hdf_file["sequences"]) if normalize else None for hdf_file in self.files]
+        self.chunks = []
+        self.selections = {}
+        self.num_sequences = 0
+        for file_index, hdf_file in enumerate(self.files):
+            total = len(hdf_file["sequences"])
+            chunk_length = hdf_file["sequences"].chunks[0] if hdf_file["sequences"].chunks else batch_size
+            if iterations is not None:
+                selected = np.isin(hdf_file["iterations"][:], iterations)
+            for start in range(0, total, chunk_length):
+                chunk = (file_index, start, min(start + chunk_length, total))
+                if iterations is not None:
+                    chunk_selection = selected[chunk[1]:chunk[2]]
+                    if not chunk_selection.any():
+                        continue
+                    if not chunk_selection.all():
+                        self.selections[chunk] = chunk_selection
+                    self.num_sequences += int(chunk_selection.sum())
+                else:
+                    self.num_sequences += chunk[2] - chunk[1]
+                self.chunks.append(chunk)
+
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.cache_lock = threading.Lock()
+
+    # Number of batches of an epoch
+    def __len__(self):
+        if self.drop_last:
+            return self.num_sequences // self.batch_size
+        return -(-self.num_sequences // self.batch_size)
+
+    # Function to read the sequences and labels of a chunk, from the cache if it has been read recently
+    def read_chunk(self, chunk):
+        with self.cache_lock:
+            if chunk in self.cache:
+                self.cache.move_to_end(chunk)
+                return self.cache[chunk]
+
+        file_index, start, stop = chunk
+        sequences = self.files[file_index]["sequences"][start:stop]
+        labels = self.files[file_index]["indexes"][start:stop]
+        if chunk in self.selections:
+            sequences = sequences[self.selections[chunk]]
+            labels = labels[self.selections[chunk]]
+        sequences = normalize_sequences(sequences, self.normalizations[file_index])
+
+        size = sequences.nbytes + labels.nbytes
+        if size <= self.cache_max_bytes:
+            with self.cache_lock:
+                if chunk not in self.cache:
+                    self.cache[chunk] = (sequences, labels)
+                    self.cache_bytes += size
+                # Remove the least recently used chunks
+                while self.cache_bytes > self.cache_max_bytes:
+                    old_sequences, old_labels = self.cache.popitem(last=False)[1]
+                    self.cache_bytes -= old_sequences.nbytes + old_labels.nbytes
+        return sequences, labels
+
+    # Function to generate the batches of an epoch, reading the chunks ahead with the threads of "executor"
+    def generate_batches(self, executor):
+        order = self.rng.permutation(len(self.chunks)) if self.shuffle else range(len(self.chunks))
+        chunks = iter([self.chunks[index] for index in order])
+
+        # The reads are submitted in the order the chunks are used, a bounded number of chunks ahead.
+        reads = deque()
+        def submit_read():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                reads.append(executor.submit(self.read_chunk, chunk))
+        for _ in range(self.shuffle_chunks + 2 * self.workers):
+            submit_read()
+
+        # Sequences of the previous group left over after its last complete batch
+        remaining = []
+        while reads:
+            group = list(remaining)
+            while reads and len(group) < len(remaining) + self.shuffle_chunks:
+                group.append(reads.popleft().result())
+                submit_read()
+            sequences = np.concatenate([block[0] for block in group])
+            labels = np.concatenate([block[1] for block in group])
+            if self.shuffle:
+                permutation = self.rng.permutation(len(sequences))
+                sequences, labels = sequences[permutation], labels[permutation]
+
+            complete = len(sequences) - len(sequences) % self.batch_size
+            for start in range(0, complete, self.batch_size):
+                yield sequences[start:start + self.batch_size], labels[start:start + self.batch_size]
+            remaining = [(sequences[complete:], labels[complete:])]
+
+        if remaining and len(remaining[0][0]) and not self.drop_last:
+            yield remaining[0]
+
+    # The batches are generated by a background thread and taken from a bounded queue, so the next batches are read while the
+    # current one is used. Stopping the iteration early (or an error in the background thread) stops the generation of the epoch.
+    def __iter__(self):
+        batches = queue.Queue(maxsize=self.prefetch_batches)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                with ThreadPoolExecutor(self.workers) as executor:
+                    for batch in self.generate_batches(executor):
+                        if not put(batch):
+                            return
+                put(None)
+            except Exception as error:
+                put(error)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            producer.join()
+
+    # Function to close the HDF5 files
+    def close(self):
+        for hdf_file in self.files:
+            hdf_file.close()
+        self.cache.clear()
+        self.cache_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
@@ -1,128 +1,522 @@
-import os
-import csv
-import pandas as pd
-from tqdm import tqdm
-import time
-import re
-import numpy as np
-import h5py
-
-
-###########################################################
-#                                                         #
-#   Configuration for the Generation of Sequences BEGIN   #   
-#                                                         #
-###########################################################
-
-# Base directory where the folder containing the data(in Multiple .CSV format) are located.
-folder = "DiskUnit:/path/to/Data's/Folder"
-
-# List with the maximum number of pairs of T-V samples per algorithm.
-max_pair_samples = [79600, 79600, 100000, 70000, 12000] # number of pairs of samples per algorithm, in checking order:
-# A1_SIZE = 159200
-# A2_SIZE = 159200
-# A3_SIZE = 200000
-# A4_SIZE = 140000
-# A5_SIZE = 24000
-
-# Define the sequence length
-sequence_length = 100
-
-###########################################################
-#                                                         #
-#   Configuration for the Generation of Sequences END     #   
-#                                                         #
-###########################################################
-
-
-# Initialize the global sequences list
-sequences = []
-
-current_board = 1
-
-# Define a regular expression pattern to extract the X, Y, and Z values
-pattern = r'(\d+)_(\d+)_(\d+)\.csv'
-
-# Function to read and process a CSV file
-def process_csv_file(file_path, max_samples):
-    global sequences
-    
-    with open(file_path, 'r') as csv_file:
-        csv_reader = csv.DictReader(csv_file, delimiter=';')  # Specify the delimiter
-        sequence = []
-        sample_count = 0  # Initialize a counter for the samples processed
-        for row in csv_reader:
-            voltage = float(row['Voltage Value'])
-            temperature = float(row['Temperature Value'])
-            pair = [voltage, temperature]
-            sequence.append(pair)
-            sample_count += 1  # Increment the sample count
-            
-            if len(sequence) == sequence_length:
-                sequences.append(sequence)
-                sequence = []
-                
-            # Check if we have reached max_samples
-            if sample_count >= max_samples:
-                break
-
-# Function to normalize (Z-score normalization) save sequences to an HDF5 file for a specific board
-def save_sequences_to_hdf5(board, data):
-    file_name = f'board_{board}_sequences.h5'
-    with h5py.File(file_name, 'w') as hdf_file:
-        data_array = np.array(data)
-        
-        # Z-score Data Normalization BEGIN
-        voltages = data_array[:, :, 0]
-        temperatures = data_array[:, :, 1]
-
-        mean_volt = np.mean(voltages)
-        std_volt = np.std(voltages)
-        mean_temp = np.mean(temperatures)
-        std_temp = np.std(temperatures)
-        
-        normalized_voltages = (voltages - mean_volt) / std_volt
-        normalized_temperatures = (temperatures - mean_temp) / std_temp
-
-        normalized_data = np.dstack((normalized_voltages, normalized_temperatures))
-        # Z-score Data Normalization  END
-        
-        # Create Indexes for training dataset
-        indexes = [board] * len(normalized_data)
-        # Include in hdf5 file
-        hdf_file.create_dataset('sequences', data = normalized_data)
-        hdf_file.create_dataset('indexes', data = indexes)
-        
-        print(f"\nFile {file_name} has been created\n")
-
-
-#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-
-
-# Get the list of files in the folder
-files = os.listdir(folder)
-
-# Sort the list of files based on the X_Y_Z criteria
-sorted_files = sorted(files, key=lambda x: tuple(map(int, re.search(pattern, x).groups())))
-
-# Iterate through the sorted files and get the Y value
-for file in sorted_files:
-    x, y, z = map(int, re.search(pattern, file).groups())
-    max_samples = max_pair_samples[y - 1]  # Adjust for 0-based indexing
-    
-    if x != current_board:
-        save_sequences_to_hdf5(current_board, sequences)
-        sequences = []
-    
-    file_path = os.path.join(folder, file)
-    print(f"\nFilepath: {file_path}")
-    process_csv_file(file_path, max_samples)
-    
-    current_board = x
-
-# Ensure Last Board sequence file is generated
-if(sequences):
-    save_sequences_to_hdf5(current_board, sequences)
-    sequences = []
\ No newline at end of file
+import io
+import os
+import pandas as pd
+from tqdm import tqdm
+import time
+import re
+import numpy as np
+import h5py
+from itertools import groupby, repeat
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from RawParser import convert_raw_file, prefetch_raw_file
+from Prefetcher import Prefetcher
+from ArchiveSource import open_source, source_size, reading_workers
+from DatasetCatalog import DatasetCatalog
+from BuildManifest import BuildManifest, file_checksum
+from Instrumentation import RunReport, new_metrics, measure, count, merge_metrics
+
+# The lz4 compression filter of the HDF5 files is provided by the optional hdf5plugin package.
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+
+###########################################################
+#                                                         #
+#   Configuration for the Generation of Sequences BEGIN   #   
+#                                                         #
+###########################################################
+
+# Base directory where the folder containing the data(in Multiple .CSV format) are located.
+folder = "DiskUnit:/path/to/Data's/Folder"
+
+# List with the maximum number of pairs of T-V samples per algorithm.
+max_pair_samples = [79600, 79600, 100000, 70000, 12000] # number of pairs of samples per algorithm, in checking order:
+# A1_SIZE = 159200
+# A2_SIZE = 159200
+# A3_SIZE = 200000
+# A4_SIZE = 140000
+# A5_SIZE = 24000
+
+# Define the sequence length
+sequence_length = 100
+
+# Number of pairs between the beginning of two consecutive sequences. It is equal to "sequence_length" for consecutive sequences,
+# and lower values generate sequences overlapping by "sequence_length - sequence_stride" pairs (e.g., for data augmentation).
+sequence_stride = sequence_length
+
+# Source of the data used to generate the sequences:
+# "csv" reads the CSV files (in Multiple .CSV format) located in "folder".
+# "raw" reads the "data_Z.txt" files of the "X_Y" folders located in "raw_directory" directly, without generating the CSV files with DataBuilder.
+input_mode = "csv"
+
+# Base directory where the "X_Y" folders containing the raw data are located, or the path of the archive of the dataset (.zip, .tar or
+# .tar.gz) whose files are read directly from the archive (only for the "raw" input mode).
+raw_directory = "DiskUnit:/path/to/Data's/Folders"
+
+# Catalog of the dataset (see DatasetCatalog) from which the raw files of the "catalog_acquisition" acquisition are listed, along with
+# their number of samples, instead of scanning the folders of "raw_directory" (None to scan them, only for the "raw" input mode).
+catalog_path = None
+catalog_acquisition = "ACQ1"
+
+# Decimation factor, method ("stride" or "mean") and phase ("carry" or "reset") and T-V Normalization applied to the raw data,
+# as in DataBuilder (only for the "raw" input mode).
+decimation_factor = 1
+decimation_method = "stride"
+decimation_phase = "carry"
+normalize_tv = False
+
+# The address of the CSV table with the sensor calibration values for the boards (only if "normalize_tv" is enabled).
+boards_data_table = "DiskUnit:/path/to/Data/Folder/Table_UIDS.csv"
+
+# Folder where the parsed "data_Z.txt" files are cached as .npy arrays, shared with DataBuilder (None disables the cache).
+cache_directory = None
+# Maximum size of the cache folder in bytes, the least recently used files are removed when it is exceeded.
+cache_max_bytes = 4 * 1024**3
+
+# Data type used to store the sequences in the HDF5 files.
+storage_dtype = np.float32
+
+# Number of sequences per chunk of the HDF5 files, which should match the training batch size (chunks are the unit of reading and compression).
+chunk_sequences = 256
+
+# Compression filter of the HDF5 files ("gzip", "lzf", "lz4" or None) and byte shuffling before compression.
+hdf5_compression = "gzip"
+hdf5_shuffle = True
+
+# Z-score Data Normalization of the voltage and temperature values. The computed statistics are saved as attributes of the HDF5 files
+# and the sequences are stored without normalizing, so they are normalized when they are read (see SequenceLoader and ShardExporter).
+zscore_normalization = True
+
+# Statistics used by the normalization: "board" normalizes each board with its own statistics, "global" uses the statistics of all
+# the boards, and "train" the statistics of the sequences of the "train_iterations" iterations of all the boards (so no statistics
+# are taken from the validation/test iterations).
+normalization_scope = "board"
+train_iterations = list(range(1, 15))
+
+# Fixed statistics to normalize with instead of computing them (e.g., the "mean" and "std" attributes saved in the HDF5 files of the
+# training data, to normalize the data used at inference time): {"mean": [voltage, temperature], "std": [voltage, temperature]}.
+# The sequences are normalized with them as they are written.
+normalization_stats = None
+
+# Number of worker processes generating the files of the boards in parallel (1 generates them one after another in the main process).
+parallel_workers = 1
+
+# Number of input files of each board read ahead by background threads while the current one is processed, so the reads (e.g., from a
+# network share) overlap with the generation of the sequences (0 reads each file when it is processed).
+prefetch_files = 2
+
+# Maximum memory (address space) of each worker process in bytes, so that the workers together do not exceed the memory of the node
+# (None for no limit). A worker exceeding it stops the run with an error. It is only applied on Linux and macOS.
+worker_memory_limit = None
+
+# Record the generated HDF5 files in a build manifest, so that a new run skips the boards whose file is up to date
+# and only generates the missing or stale ones (e.g., after an interrupted run or when new files are added).
+use_build_manifest = False
+manifest_filename = "sequences_manifest.jsonl"
+
+# Name of the JSON report with the time, throughput and memory of each stage and file of the run (None to not save it).
+run_report_filename = "sequences_report.json"
+
+###########################################################
+#                                                         #
+#   Configuration for the Generation of Sequences END     #   
+#                                                         #
+###########################################################
+
+
+# Define a regular expression pattern to extract the X, Y, and Z values
+pattern = r'(\d+)_(\d+)_(\d+)\.csv'
+
+# Regular expression patterns to extract the X and Y values of the raw data folders, and the Z value of their files
+raw_folder_pattern = r'^(\d+)_(\d+)$'
+raw_file_pattern = r'^data_(\d+)\.txt$'
+
+# Counter to control the decimation (only for the "raw" input mode).
+pair_counter = 0
+
+# Function to split the (N, 2) array of pairs of a file into sequences of "sequence_length" pairs, one every "sequence_stride" pairs.
+# The sequences are a view of the pairs (the samples are not copied until they are saved), and the last incomplete sequence of the file is discarded.
+def split_sequences(pairs):
+    if len(pairs) < sequence_length:
+        return np.empty((0, sequence_length, 2), dtype=pairs.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(pairs, sequence_length, axis=0)[::sequence_stride]
+    # The window view has the shape (sequences, 2, sequence_length), so it is transposed to (sequences, sequence_length, 2).
+    return windows.transpose(0, 2, 1)
+
+# Function to read and process a CSV file (given by its path or as a file object with its content).
+# Only the voltage and temperature columns of the first "max_samples" rows are parsed, by the C parser of pandas with the
+# round-trip float conversion, which gives the same values as Python's float().
+def process_csv_file(file_path, max_samples):
+    csv_data = pd.read_csv(file_path, sep=';', usecols=['Voltage Value', 'Temperature Value'], nrows=max_samples,
+                           dtype=np.float64, engine='c', float_precision='round_trip')
+    return csv_data[['Voltage Value', 'Temperature Value']].to_numpy(dtype=np.float64).reshape(-1, 2)
+
+# Function to read and process a raw "data_Z.txt" file, applying the calibration, decimation and truncation in memory.
+# "data_offset" is the offset of the first sample of the file recorded in the catalog (None if it is not listed from a catalog).
+def process_raw_file(file_path, max_samples, pair_counter, calibration, metrics=None, prefetched=None, data_offset=None):
+    # The raw files hold two lines (temperature and voltage) per pair of samples.
+    cache = (cache_directory, cache_max_bytes) if cache_directory is not None else None
+    voltage, temperature, _, _ = convert_raw_file(file_path, 2 * max_samples, decimation_factor, pair_counter, calibration, cache, metrics, prefetched,
+                                                  decimation_method, data_offset)
+    return np.column_stack((voltage, temperature)).astype(np.float64)[:max_samples]
+
+# Function to read an input file of a board ahead of its processing (in a background thread of a Prefetcher), returning its content
+# (the samples of a raw file or the bytes of a CSV file) and the metrics of the read. The raw files of the parse cache are not read ahead (None).
+# "item" is a ((X, Y, Z, path), data_offset) tuple, with the offset of the first sample of a raw file recorded in the catalog (or None).
+def prefetch_file(item):
+    (x, y, z, file_path), data_offset = item
+    if input_mode == "raw":
+        if cache_directory is not None:
+            return None
+        return prefetch_raw_file(file_path, 2 * max_pair_samples[y - 1], data_offset)
+    metrics = new_metrics()
+    with measure(metrics, "read"):
+        with open(file_path, "rb") as csv_file:
+            content = csv_file.read()
+    count(metrics, "read", bytes_read=len(content))
+    return content, metrics
+
+# Function to list the raw "data_Z.txt" files of a source (see ArchiveSource and DatasetCatalog) as (X, Y, Z, path) tuples
+def list_raw_files(source):
+    raw_files = []
+    for folder_name in source.listdir():
+        folder_match = re.search(raw_folder_pattern, folder_name)
+        if not folder_match:
+            continue
+        x, y = map(int, folder_match.groups())
+        for file_name in source.listdir(folder_name):
+            file_match = re.search(raw_file_pattern, file_name)
+            if file_match:
+                raw_files.append((x, y, int(file_match.group(1)), source.path(folder_name, file_name)))
+    return raw_files
+
+# Function to get the h5py compression options of the "hdf5_compression" filter
+def compression_options():
+    if hdf5_compression is None:
+        return {}
+    if hdf5_compression == "lz4":
+        if hdf5plugin is None:
+            raise ImportError("The lz4 compression of the HDF5 files requires the hdf5plugin package.")
+        return dict(hdf5plugin.LZ4())
+    return {"compression": hdf5_compression}
+
+# Function to create the HDF5 file of a board, with empty resizable and chunked datasets where the sequences are appended as they are generated.
+# Along with the board index ("indexes"), the algorithm and iteration of the file of each sequence are stored.
+def create_sequences_file(file_name):
+    hdf_file = h5py.File(file_name, 'w')
+    hdf_file.create_dataset('sequences', shape=(0, sequence_length, 2), maxshape=(None, sequence_length, 2), dtype=storage_dtype,
+                            chunks=(chunk_sequences, sequence_length, 2), shuffle=hdf5_shuffle, **compression_options())
+    for label, dtype in [('indexes', np.int64), ('algorithms', np.uint8), ('iterations', np.uint8)]:
+        hdf_file.create_dataset(label, shape=(0,), maxshape=(None,), dtype=dtype,
+                                chunks=(chunk_sequences,), shuffle=hdf5_shuffle, **compression_options())
+    hdf_file['sequences'].attrs['normalized'] = False
+    return hdf_file
+
+# Function to append the sequences of a file, along with their labels, to the HDF5 file of the board.
+# If the normalization statistics are already known ("stats"), the sequences are normalized as they are written.
+def append_sequences(hdf_file, board, algorithm, iteration, file_sequences, stats=None):
+    start = len(hdf_file['sequences'])
+    end = start + len(file_sequences)
+    hdf_file['sequences'].resize(end, axis=0)
+    if stats is not None:
+        file_sequences = (file_sequences - stats["mean"]) / stats["std"]
+    hdf_file['sequences'][start:end] = file_sequences
+    
+    # Create Indexes for training dataset
+    for label, value in [('indexes', board), ('algorithms', algorithm), ('iterations', iteration)]:
+        hdf_file[label].resize(end, axis=0)
+        hdf_file[label][start:end] = value
+
+# Function to create empty statistics (number of values, mean and sum of squared deviations of the voltage and temperature values)
+def empty_statistics():
+    return {"count": 0, "mean": np.zeros(2), "m2": np.zeros(2)}
+
+# Function to merge two statistics with the parallel algorithm of Chan et al., so the statistics are gathered in a single pass
+def combine_statistics(stats, other):
+    count = stats["count"] + other["count"]
+    if count == 0:
+        return empty_statistics()
+    delta = other["mean"] - stats["mean"]
+    return {
+        "count": count,
+        "mean": stats["mean"] + delta * other["count"] / count,
+        "m2": stats["m2"] + other["m2"] + delta ** 2 * stats["count"] * other["count"] / count
+    }
+
+# Function to get the statistics of the voltage and temperature values of the sequences of a file, computed from its (N, 2) pairs
+# instead of the sequences, so the overlapping sequences (a view of the pairs) are never copied. Each pair is counted once per
+# sequence that contains it: the sequences do not overlap if "sequence_stride" is not lower than "sequence_length", and otherwise
+# each pair is weighted by the number of sequences covering it (a cumulative sum of the sequences starting and ending at each pair).
+def sequences_statistics(pairs):
+    num_sequences = (len(pairs) - sequence_length) // sequence_stride + 1 if len(pairs) >= sequence_length else 0
+    count = num_sequences * sequence_length
+    if count == 0:
+        return empty_statistics()
+    if sequence_stride >= sequence_length:
+        covered = pairs[:(num_sequences - 1) * sequence_stride + sequence_length]
+        if sequence_stride > sequence_length:
+            covered = covered[np.arange(len(covered)) % sequence_stride < sequence_length]
+        mean = covered.mean(axis=0)
+        return {"count": count, "mean": mean, "m2": ((covered - mean) ** 2).sum(axis=0)}
+    starts = np.arange(num_sequences) * sequence_stride
+    coverage = np.zeros(len(pairs) + 1, dtype=np.int64)
+    coverage[starts] += 1
+    coverage[starts + sequence_length] -= 1
+    weights = np.cumsum(coverage[:-1]).astype(np.float64)
+    mean = weights @ pairs / count
+    return {"count": count, "mean": mean, "m2": weights @ ((pairs - mean) ** 2)}
+
+# Function to get the mean and standard deviation used by the Z-score normalization
+def normalization_parameters(stats):
+    return {"mean": stats["mean"], "std": np.sqrt(stats["m2"] / stats["count"])}
+
+# Function to save the normalization parameters as attributes of the sequences, to reuse them (e.g., at inference time).
+# "normalized" tells whether the sequences were normalized as they were written (fixed statistics), or are stored without normalizing
+# and normalized with these attributes when they are read (see SequenceLoader), so the file is never rewritten to normalize it.
+def save_normalization_attributes(hdf_file, parameters, normalized):
+    attributes = hdf_file['sequences'].attrs
+    attributes['normalized'] = normalized
+    attributes['normalization_scope'] = normalization_scope if normalization_stats is None else "fixed"
+    attributes['mean'] = np.asarray(parameters["mean"], dtype=np.float64)
+    attributes['std'] = np.asarray(parameters["std"], dtype=np.float64)
+
+
+# Function to generate the HDF5 file of a board from its files (one worker task of the parallel mode).
+# Returns the board, the name of the file, its number of sequences and the statistics of its sequences used by the "global" and "train" scopes.
+def generate_board_file(task):
+    board, board_files, phases, data_offsets, calibration, fixed_parameters = task
+    file_name = f'board_{board}_sequences.h5'
+    board_stats = empty_statistics()
+    scope_stats = empty_statistics()
+    hdf_file = create_sequences_file(file_name)
+    # Metrics of each file, and of the stages of the whole board (size of the written file)
+    file_metrics = []
+    board_metrics = new_metrics()
+    # The next files of the board are read by background threads while each one is processed.
+    prefetched_files = Prefetcher(prefetch_file, list(zip(board_files, data_offsets)), prefetch_files) if prefetch_files > 0 else repeat(None)
+    for (x, y, z, file_path), phase, data_offset, prefetched in zip(board_files, phases, data_offsets, prefetched_files):
+        max_samples = max_pair_samples[y - 1]  # Adjust for 0-based indexing
+        metrics = new_metrics()
+        
+        if input_mode == "raw":
+            pairs = process_raw_file(file_path, max_samples, phase, calibration, metrics, prefetched, data_offset)
+        elif prefetched is not None:
+            content, read_metrics = prefetched
+            merge_metrics(metrics, read_metrics)
+            with measure(metrics, "parse"):
+                pairs = process_csv_file(io.BytesIO(content), max_samples)
+            count(metrics, "parse", samples=pairs.size)
+        else:
+            with measure(metrics, "read"):
+                pairs = process_csv_file(file_path, max_samples)
+            count(metrics, "read", samples=pairs.size, bytes_read=os.path.getsize(file_path))
+        with measure(metrics, "sequence"):
+            file_sequences = split_sequences(pairs)
+        count(metrics, "sequence", samples=pairs.size)
+        
+        # Gather the normalization statistics while the sequences are generated
+        if zscore_normalization and fixed_parameters is None:
+            with measure(metrics, "normalize"):
+                file_stats = sequences_statistics(pairs)
+                board_stats = combine_statistics(board_stats, file_stats)
+                if normalization_scope == "global" or (normalization_scope == "train" and z in train_iterations):
+                    scope_stats = combine_statistics(scope_stats, file_stats)
+        
+        with measure(metrics, "HDF5 write"):
+            append_sequences(hdf_file, board, y, z, file_sequences, fixed_parameters)
+        count(metrics, "HDF5 write", samples=np.size(file_sequences))
+        # Samples read from the input file (before the decimation in the "raw" input mode)
+        num_samples = metrics["decimate"]["samples"] if input_mode == "raw" else pairs.size
+        file_metrics.append(((x, y, z, file_path), num_samples, metrics))
+    
+    num_sequences = len(hdf_file['sequences'])
+    if num_sequences and fixed_parameters is not None:
+        save_normalization_attributes(hdf_file, fixed_parameters, True)
+    elif num_sequences and zscore_normalization and normalization_scope == "board":
+        save_normalization_attributes(hdf_file, normalization_parameters(board_stats), False)
+    hdf_file.close()
+    
+    # No file is kept for the boards without sequences.
+    if num_sequences == 0:
+        os.remove(file_name)
+    else:
+        count(board_metrics, "HDF5 write", bytes_written=os.path.getsize(file_name))
+    return board, file_name, num_sequences, scope_stats, file_metrics, board_metrics
+
+# Function to limit the memory of a worker process to "worker_memory_limit" bytes
+def limit_worker_memory(max_bytes):
+    try:
+        import resource
+    except ImportError:
+        return  # Not available on Windows
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+
+
+if __name__ == "__main__":
+    # Report of the run, with the metrics of each stage and file
+    report = RunReport("Sequencer", {"input_mode": input_mode, "sequence_length": sequence_length, "sequence_stride": sequence_stride,
+                                     "max_pair_samples": max_pair_samples, "decimation_factor": decimation_factor, "decimation_method": decimation_method,
+                                     "decimation_phase": decimation_phase, "normalize_tv": normalize_tv, "storage_dtype": np.dtype(storage_dtype).name, "zscore_normalization": zscore_normalization,
+                                     "normalization_scope": normalization_scope, "parallel_workers": parallel_workers, "prefetch_files": prefetch_files,
+                                     "cache_directory": cache_directory, "catalog_path": catalog_path})
+    
+    if input_mode == "raw":
+        # Load T-V Normalization Table if selected
+        if normalize_tv:
+            df = pd.read_csv(boards_data_table, sep = ';')
+        
+        # Get the list of raw files, sorted based on the X_Y_Z criteria (from the catalog of the dataset if it is given)
+        with report.measure("scan"):
+            if catalog_path is not None:
+                source = DatasetCatalog(catalog_path).source(catalog_acquisition)
+            else:
+                source = open_source(raw_directory)
+            sorted_files = sorted(list_raw_files(source))
+    else:
+        with report.measure("scan"):
+            # Get the list of the "X_Y_Z.csv" files in the folder (other files, such as the build manifest of DataBuilder or the
+            # temporary files of an interrupted build, are skipped)
+            files = [file for file in os.listdir(folder) if re.fullmatch(pattern, file)]
+
+            # Sort the list of files based on the X_Y_Z criteria
+            sorted_files = sorted((*map(int, re.fullmatch(pattern, file).groups()), os.path.join(folder, file)) for file in files)
+
+    if use_build_manifest:
+        manifest = BuildManifest(manifest_filename)
+
+    # Normalization parameters known before generating the sequences (only when fixed statistics are given), which are applied as the sequences are written
+    fixed_parameters = None
+    if zscore_normalization and normalization_stats is not None:
+        fixed_parameters = {"mean": np.asarray(normalization_stats["mean"], dtype=np.float64), "std": np.asarray(normalization_stats["std"], dtype=np.float64)}
+
+    # The boards are normalized independently unless the statistics of all the boards ("global" or "train" scopes) are used
+    independent_boards = not zscore_normalization or fixed_parameters is not None or normalization_scope == "board"
+
+    # Group the sorted files board by board, each board is a task that generates its own HDF5 file
+    tasks = []
+    board_configs = {}
+    for current_board, board_files in groupby(sorted_files, key=lambda file: file[0]):
+        board_files = list(board_files)
+        input_paths = [file[3] for file in board_files]
+        file_name = f'board_{current_board}_sequences.h5'
+        
+        # Each file contributes "max_pair_samples" pairs (or fewer if the catalog records fewer samples), so the decimation phase of every
+        # file is known before reading them and continues across files as in DataBuilder, unless every file starts at a new block (only
+        # for the "raw" input mode). Without a catalog, the phase shifts after a file with fewer samples.
+        phases = []
+        for x, y, z, file_path in board_files:
+            if decimation_phase == "reset":
+                pair_counter = 0
+            phases.append(pair_counter)
+            file_pairs = min(source.samples(file_path), 2 * max_pair_samples[y - 1]) // 2 if input_mode == "raw" and catalog_path is not None else max_pair_samples[y - 1]
+            pair_counter = (pair_counter + file_pairs) % decimation_factor
+        
+        # Offsets of the first samples of the raw files recorded in the catalog, so they are not located again when the files are read
+        if input_mode == "raw" and catalog_path is not None:
+            data_offsets = [source.data_offset(file[3]) for file in board_files]
+        else:
+            data_offsets = [None] * len(board_files)
+        
+        # Configuration used to generate the file of the board, as recorded in the build manifest (the fixed statistics, which may be
+        # read from the attributes of an HDF5 file as arrays, are recorded as lists)
+        config = {"input_mode": input_mode, "sequence_length": sequence_length, "sequence_stride": sequence_stride, "max_pair_samples": max_pair_samples,
+                  "storage_dtype": np.dtype(storage_dtype).name, "zscore_normalization": zscore_normalization, "normalization_scope": normalization_scope,
+                  "normalization_stats": {name: np.asarray(values, dtype=float).tolist() for name, values in normalization_stats.items()} if normalization_stats is not None else None}
+        if normalization_scope == "train":
+            config["train_iterations"] = list(train_iterations)
+        if input_mode == "raw":
+            config.update({"decimation_factor": decimation_factor, "decimation_method": decimation_method, "phases": phases, "normalize_tv": normalize_tv})
+        
+        # The files normalized with the statistics of all the boards depend on the other boards, so they are always generated again.
+        if use_build_manifest and independent_boards and manifest.is_up_to_date(file_name, input_paths, config):
+            print(f"\nFile {file_name} is up to date\n")
+            continue
+        
+        calibration = None
+        if input_mode == "raw" and normalize_tv:
+            selected_row = df[df['BOARD_NUM'] == current_board]
+            calibration = (selected_row['T_CAL_1'].values[0], selected_row['T_CAL_2'].values[0], selected_row['VREFINT_CAL'].values[0])
+        
+        tasks.append((current_board, board_files, phases, data_offsets, calibration, fixed_parameters))
+        board_configs[current_board] = (input_paths, config)
+    
+    # Generate the files of the boards in a pool of worker processes (or one after another in this process). The largest boards are
+    # started first, so the run takes about the time of the slowest board. Unlike a multiprocessing Pool, the executor reports a
+    # worker killed by the memory limit (the HDF5 library may crash when it runs out of memory) instead of waiting for it forever.
+    parallel_workers = reading_workers([file[3] for task in tasks for file in task[1]], parallel_workers)
+    if parallel_workers > 1:
+        # The work of each board is given by the samples of its files if they are known from the catalog, and by their size otherwise.
+        file_work = source.samples if input_mode == "raw" and catalog_path is not None else source_size
+        tasks.sort(key=lambda task: sum(file_work(file[3]) for file in task[1]), reverse=True)
+        if worker_memory_limit is not None:
+            executor = ProcessPoolExecutor(parallel_workers, initializer=limit_worker_memory, initargs=(worker_memory_limit,))
+        else:
+            executor = ProcessPoolExecutor(parallel_workers)
+        generated_files = (future.result() for future in as_completed([executor.submit(generate_board_file, task) for task in tasks]))
+    else:
+        executor = None
+        generated_files = map(generate_board_file, tasks)
+    
+    # The progress is counted in samples (two per T-V pair), and advanced as the files of each board are completed
+    progress_bar = tqdm(total=sum(2 * max_pair_samples[file[1] - 1] for task in tasks for file in task[1]), unit=" samples", unit_scale=True)
+    
+    # Statistics of the sequences of each board used by the "global" and "train" scopes, and files waiting for them
+    scope_stats = {}
+    pending_files = []
+    try:
+        for current_board, file_name, num_sequences, board_scope_stats, file_metrics, board_metrics in generated_files:
+            for (x, y, z, file_path), num_samples, metrics in file_metrics:
+                report.add_file(file_path, metrics, board=x, algorithm=y, iteration=z, num_samples=num_samples)
+                # The files shorter than "max_pair_samples" pairs are removed from the total
+                planned_samples = 2 * max_pair_samples[y - 1]
+                if num_samples < planned_samples:
+                    progress_bar.total -= planned_samples - num_samples
+                progress_bar.update(min(num_samples, planned_samples))
+            merge_metrics(report.stages, board_metrics)
+            progress_bar.set_postfix_str(f"Board {current_board}")
+            scope_stats[current_board] = board_scope_stats
+            if num_sequences == 0:
+                continue
+            input_paths, config = board_configs[current_board]
+            if not independent_boards:
+                pending_files.append((current_board, file_name, input_paths, config))
+                continue
+            tqdm.write(f"File {file_name} has been created")
+            if use_build_manifest:
+                manifest.record(file_name, input_paths, config, file_checksum(file_name))
+    except BrokenProcessPool as error:
+        raise RuntimeError(f"A worker process terminated abruptly (e.g., for exceeding the worker_memory_limit of {worker_memory_limit} bytes).") from error
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        progress_bar.close()
+    
+    # Save the statistics of all the boards ("global") or of their training iterations ("train") in the files, which are merged in
+    # board order so the result does not depend on the order in which the workers finish. Only the attributes of the files are written.
+    if pending_files:
+        run_stats = empty_statistics()
+        for current_board in sorted(scope_stats):
+            run_stats = combine_statistics(run_stats, scope_stats[current_board])
+        if run_stats["count"] == 0:
+            raise ValueError(f"No sequences were found to compute the statistics of the '{normalization_scope}' normalization scope.")
+        parameters = normalization_parameters(run_stats)
+        print(f"\nNormalization ({normalization_scope}): mean {parameters['mean']}, std {parameters['std']}")
+        for current_board, file_name, input_paths, config in sorted(pending_files):
+            with report.measure("normalize"), h5py.File(file_name, 'r+') as hdf_file:
+                save_normalization_attributes(hdf_file, parameters, False)
+            print(f"\nFile {file_name} has been created\n")
+            if use_build_manifest:
+                manifest.record(file_name, input_paths, config, file_checksum(file_name))
+    
+    # Save the report of the run
+    if run_report_filename is not None:
+        report.save(run_report_filename)
+        print(f"\nThe report of the run has been saved in '{run_report_filename}'.")
@@ -0,0 +1,232 @@
+import os
+import json
+import argparse
+import numpy as np
+import h5py
+from SequenceLoader import sequence_files, normalization_parameters, normalize_sequences
+try:
+    import hdf5plugin  # Registers the "lz4" filter of the files generated with hdf5_compression = "lz4"
+except ImportError:
+    hdf5plugin = None
+
+
+###########################################################
+#                                                         #
+#   Configuration for the Shard Export BEGIN              #
+#                                                         #
+###########################################################
+
+# Folder with the "board_{board}_sequences.h5" files generated by Sequencer.
+sequences_folder = "DiskUnit:/path/to/Sequences/Folder"
+
+# Folder where the shards and their index ("shards.json") are written.
+output_directory = "DiskUnit:/path/to/Shards/Folder"
+
+# Number of sequences of each shard.
+shard_size = 8192
+
+# Iterations of each split. Every sequence goes to the split of its iteration (the iterations of no split are not exported).
+split_iterations = {"train": list(range(1, 15)), "val": [15, 16, 17], "test": [18, 19, 20]}
+
+# Format of the shards: "npz" (NumPy) or "hdf5" (contiguous datasets, read sequentially without chunk lookups).
+shard_format = "npz"
+
+# Compress the shards (smaller, but slower to read).
+compress_shards = False
+
+# Discard the last sequences of each split that do not fill a whole shard, so all the shards have "shard_size" sequences
+# (otherwise they are written to a last, smaller shard).
+drop_remainder = True
+
+# Seed of the shuffle, the same seed always generates the same shards.
+seed = 0
+
+###########################################################
+#                                                         #
+#   Configuration for the Shard Export END                #
+#                                                         #
+###########################################################
+
+
+# Name of the index of the shards
+index_filename = "shards.json"
+
+# Number of HDF5 chunks read from the sequence files at a time
+read_chunks = 8
+
+
+# Export of the sequences of the Sequencer files as shards for training. Each sequence goes to the split of its iteration, and the
+# sequences of each split are shuffled and interleaved: every board is spread evenly over the split, so every shard holds about the
+# same proportion of each board as the whole split. The shards of a split have the same number of sequences, so N data loaders
+# (or nodes) can each read their own subset of them (e.g., shards[rank::N]) sequentially, one whole shard at a time.
+#
+# The sequence files are read sequentially once, and each sequence is written to its shuffled position in a scratch file of its
+# split (a memory-mapped .npy array in the output folder, removed at the end). Each shard is then a contiguous range of it.
+# The sequences stored without normalizing are normalized with the statistics saved in their file as they are read, so the
+# shards always hold normalized sequences.
+
+# Function to check that no iteration is in two splits
+def check_splits(split_iterations):
+    splits = {}
+    for split, iterations in split_iterations.items():
+        for iteration in iterations:
+            if iteration in splits:
+                raise ValueError(f"The iteration {iteration} is in the splits '{splits[iteration]}' and '{split}'.")
+            splits[iteration] = split
+
+
+# Function to compute the shuffled position of each sequence of a split, interleaving the boards.
+# Each board is shuffled, and its sequences are given evenly spaced (and jittered) keys between 0 and 1, so sorting the keys of
+# all the boards interleaves them in proportion to their number of sequences.
+def interleaved_positions(boards, rng):
+    keys = np.empty(len(boards))
+    for board in np.unique(boards):
+        selected = np.flatnonzero(boards == board)
+        keys[selected] = (rng.permutation(len(selected)) + rng.random(len(selected))) / len(selected)
+    positions = np.empty(len(boards), dtype=np.int64)
+    positions[np.argsort(keys, kind="stable")] = np.arange(len(boards))
+    return positions
+
+
+# Function to write a shard
+def write_shard(file_path, columns):
+    if shard_format == "hdf5":
+        with h5py.File(file_path, "w") as hdf_file:
+            for name, values in columns.items():
+                if compress_shards:
+                    hdf_file.create_dataset(name, data=values, compression="gzip")
+                else:
+                    hdf_file.create_dataset(name, data=values)
+    elif compress_shards:
+        np.savez_compressed(file_path, **columns)
+    else:
+        np.savez(file_path, **columns)
+
+
+# Function to read a shard into a dict of arrays ("sequences", "indexes", "algorithms" and "iterations")
+def read_shard(file_path):
+    if file_path.endswith(".h5"):
+        with h5py.File(file_path, "r") as hdf_file:
+            return {name: hdf_file[name][:] for name in hdf_file}
+    with np.load(file_path) as shard:
+        return {name: shard[name] for name in shard.files}
+
+
+# Function to get the paths of the shards of a split, those read by the data loader "rank" out of "world_size" loaders
+def shard_paths(directory, split, rank=0, world_size=1):
+    with open(os.path.join(directory, index_filename), "r") as index_file:
+        index = json.load(index_file)
+    shards = index["splits"][split]["shards"]
+    return [os.path.join(directory, shard["file"]) for shard in shards[rank::world_size]]
+
+
+# Function to export the sequence files as shards, returning the index of the shards
+def export_shards(file_paths, output_directory):
+    os.makedirs(output_directory, exist_ok=True)
+    check_splits(split_iterations)
+    rng = np.random.default_rng(seed)
+
+    # The labels of all the sequences are read first (they are small), to plan the position of every sequence.
+    labels = []
+    normalization = {}
+    for file_path in file_paths:
+        with h5py.File(file_path, "r") as hdf_file:
+            labels.append({name: hdf_file[name][:] for name in ["indexes", "algorithms", "iterations"]})
+            attributes = hdf_file["sequences"].attrs
+            sequence_shape, sequence_dtype = hdf_file["sequences"].shape[1:], hdf_file["sequences"].dtype
+            if len(labels[-1]["indexes"]):
+                normalization[int(labels[-1]["indexes"][0])] = {name: np.asarray(attributes[name]).tolist() for name in attributes}
+                if normalization_parameters(hdf_file["sequences"]) is not None:
+                    normalization[int(labels[-1]["indexes"][0])]["normalized"] = True
+
+    index = {"shard_size": shard_size, "format": shard_format, "seed": seed, "sequence_shape": list(sequence_shape),
+             "dtype": np.dtype(sequence_dtype).name, "normalization": normalization, "splits": {}}
+    plans = {}
+    for split in split_iterations:
+        # Sequences of the split as (file, row) pairs, in the order of the files
+        selected = [np.flatnonzero(np.isin(file_labels["iterations"], list(split_iterations[split]))) for file_labels in labels]
+        file_numbers = np.concatenate([np.full(len(rows), number) for number, rows in enumerate(selected)] or [np.empty(0, dtype=np.int64)])
+        rows = np.concatenate(selected or [np.empty(0, dtype=np.int64)]).astype(np.int64)
+        split_labels = {name: np.concatenate([file_labels[name][file_rows] for file_labels, file_rows in zip(labels, selected)] or [np.empty(0)])
+                        for name in ["indexes", "algorithms", "iterations"]}
+        positions = interleaved_positions(split_labels["indexes"], rng)
+
+        num_shards = len(rows) // shard_size if drop_remainder else -(-len(rows) // shard_size)
+        num_exported = min(len(rows), num_shards * shard_size)
+        # Labels of the exported sequences, in their shuffled order
+        exported = positions < num_exported
+        ordered_labels = {}
+        for name, values in split_labels.items():
+            ordered_labels[name] = np.empty(num_exported, dtype=values.dtype)
+            ordered_labels[name][positions[exported]] = values[exported]
+
+        scratch_path = os.path.join(output_directory, f".{split}_scratch.npy")
+        scratch = np.lib.format.open_memmap(scratch_path, mode="w+", dtype=sequence_dtype, shape=(num_exported, *sequence_shape)) if num_exported else None
+        plans[split] = {"file_numbers": file_numbers, "rows": rows, "positions": positions, "num_shards": num_shards,
+                        "num_exported": num_exported, "labels": ordered_labels, "scratch": scratch, "scratch_path": scratch_path}
+
+    # Read every sequence file once, in blocks of whole chunks, and write each sequence to its position in the scratch file of its split.
+    for number, file_path in enumerate(file_paths):
+        with h5py.File(file_path, "r") as hdf_file:
+            sequences = hdf_file["sequences"]
+            parameters = normalization_parameters(sequences)
+            block_length = (sequences.chunks[0] if sequences.chunks else 1024) * read_chunks
+            destinations = []
+            for plan in plans.values():
+                from_file = (plan["file_numbers"] == number) & (plan["positions"] < plan["num_exported"])
+                destinations.append((plan["scratch"], plan["rows"][from_file], plan["positions"][from_file]))
+            for start in range(0, len(sequences), block_length):
+                block = normalize_sequences(sequences[start:start + block_length], parameters)
+                for scratch, rows, positions in destinations:
+                    in_block = (rows >= start) & (rows < start + len(block))
+                    if in_block.any():
+                        scratch[positions[in_block]] = block[rows[in_block] - start]
+
+    # Write the shards of each split as contiguous ranges of its scratch file.
+    extension = "h5" if shard_format == "hdf5" else "npz"
+    for split, plan in plans.items():
+        shards = []
+        for shard_number in range(plan["num_shards"]):
+            start, stop = shard_number * shard_size, min((shard_number + 1) * shard_size, plan["num_exported"])
+            columns = {"sequences": np.asarray(plan["scratch"][start:stop])}
+            columns.update({name: values[start:stop] for name, values in plan["labels"].items()})
+            file_name = f"{split}-{shard_number:05d}.{extension}"
+            write_shard(os.path.join(output_directory, file_name), columns)
+            boards, counts = np.unique(columns["indexes"], return_counts=True)
+            shards.append({"file": file_name, "sequences": stop - start, "boards": {int(board): int(count) for board, count in zip(boards, counts)}})
+        if plan["scratch"] is not None:
+            del plan["scratch"]
+            os.remove(plan["scratch_path"])
+        index["splits"][split] = {"iterations": list(split_iterations[split]), "sequences": len(plan["rows"]),
+                                  "exported_sequences": plan["num_exported"], "shards": shards}
+
+    # The index is written last, so an interrupted export has no index.
+    with open(os.path.join(output_directory, index_filename + ".tmp"), "w") as index_file:
+        json.dump(index, index_file, indent=1)
+    os.replace(os.path.join(output_directory, index_filename + ".tmp"), os.path.join(output_directory, index_filename))
+    return index
+
+
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+
+
+if __name__ == "__main__":
+    # The options of the configuration section can be replaced from the command line
+    parser = argparse.ArgumentParser(description="Export the sequences generated by Sequencer as shuffled, fixed-size shards per split.")
+    parser.add_argument("--input", default=sequences_folder, help="folder of the 'board_{board}_sequences.h5' files")
+    parser.add_argument("--output", default=output_directory, help="folder of the shards")
+    parser.add_argument("--shard-size", type=int, default=shard_size)
+    parser.add_argument("--splits", type=json.loads, help='JSON object with the iterations of each split, e.g. {"train": [1, 2], "val": [3]}')
+    parser.add_argument("--format", choices=["npz", "hdf5"], default=shard_format)
+    parser.add_argument("--seed", type=int, default=seed)
+    arguments = parser.parse_args()
+    shard_size, shard_format, seed = arguments.shard_size, arguments.format, arguments.seed
+    if arguments.splits:
+        split_iterations = arguments.splits
+
+    index = export_shards(sequence_files(arguments.input), arguments.output)
+    for split, split_index in index["splits"].items():
+        print(f"{split}: {len(split_index['shards'])} shards with {split_index['exported_sequences']} of {split_index['sequences']} sequences")
+    print(f"The shards have been saved in '{arguments.output}'.")
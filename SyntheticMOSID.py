@@ -0,0 +1,141 @@
+import os
+import csv
+import argparse
+import numpy as np
+from RawParser import convert_file_job
+
+
+###########################################################
+#                                                         #
+#   Configuration for the Synthetic Dataset BEGIN         #
+#                                                         #
+###########################################################
+
+# Folder where the synthetic "X_Y" folders and the "Table_UIDS.csv" table are generated.
+output_directory = "DiskUnit:/path/to/Synthetic/Data/Folder"
+
+# Folder where the Multiple Files CSVs of the synthetic data are generated, as DataBuilder does without decimation nor normalization and
+# truncating the files to the scaled number of samples (None to skip them).
+csv_directory = None
+
+# Number of boards, algorithms and iterations of the synthetic dataset (the real dataset has 20 boards, 5 algorithms and 20 iterations).
+boards = 20
+algorithms = 5
+iterations = 20
+
+# Number of samples (lines) per algorithm of the real "data_Z.txt" files, and the fraction of them generated in each synthetic file.
+samples_per_algorithm = [159200, 159200, 200000, 140000, 24000]
+scale = 1.0
+
+# Seed of the random generator, the same seed always generates the same dataset.
+seed = 0
+
+###########################################################
+#                                                         #
+#   Configuration for the Synthetic Dataset END           #
+#                                                         #
+###########################################################
+
+
+# Define the column labels (as in DataBuilder).
+fields = ["Voltage Value", "Temperature Value", "Board Number", "Algorithm", "Iteration"]
+
+# Function to generate the calibration values of the boards as a {board: (t_cal_1, t_cal_2, vrefint_cal)} dict,
+# around the typical values of the STM32L factory calibration.
+def generate_calibration(rng, num_boards):
+    calibration = {}
+    for board in range(1, num_boards + 1):
+        t_cal_1 = int(rng.normal(675, 8))
+        t_cal_2 = int(t_cal_1 + rng.normal(185, 5))
+        vrefint_cal = int(rng.normal(1670, 10))
+        calibration[board] = (t_cal_1, t_cal_2, vrefint_cal)
+    return calibration
+
+# Function to write the "Table_UIDS.csv" table of the boards
+def write_table(file_path, calibration, rng):
+    with open(file_path, mode='w', newline='') as table_file:
+        writer = csv.writer(table_file, delimiter=';')
+        writer.writerow(["BOARD_NUM", "BITS [95:64]", "BITS [63:32]", "BITS [31: 0]", "T_CAL_1", "T_CAL_2", "VREFINT_CAL"])
+        for board, (t_cal_1, t_cal_2, vrefint_cal) in calibration.items():
+            uid = [f"{value:08X}" for value in rng.integers(0, 2**32, size=3)]
+            writer.writerow([board, *uid, t_cal_1, t_cal_2, vrefint_cal])
+
+# Function to generate the [temperature, voltage] ADC pairs of a file.
+# Each board has its own offsets of temperature and supply voltage, each algorithm its own load (heating and voltage drop),
+# and every file starts at a slightly different ambient temperature, with sensor noise on every sample.
+def generate_pairs(rng, num_pairs, calibration, board_profile, algorithm_load):
+    t_cal_1, t_cal_2, vrefint_cal = calibration
+    temperature_offset, voltage_offset = board_profile
+    time = np.arange(num_pairs) / max(num_pairs, 1)
+
+    temperature = 25 + rng.normal(0, 0.5) + temperature_offset + 4 * algorithm_load * (1 - np.exp(-5 * time)) + rng.normal(0, 0.6, num_pairs)
+    voltage = 3.0 + voltage_offset - 0.02 * algorithm_load + 0.005 * np.sin(2 * np.pi * 50 * time) + rng.normal(0, 0.004, num_pairs)
+
+    # Inverse of the conversions of DataBuilder (see calibrate_temperature and calibrate_voltage of RawParser)
+    temperature_adc = t_cal_1 + (temperature - 30) * (t_cal_2 - t_cal_1) / 80
+    voltage_adc = 3 * vrefint_cal / voltage
+    return np.column_stack((temperature_adc, voltage_adc)).round().astype(np.int64)
+
+# Function to write a "data_Z.txt" file with its 4 header lines, its samples (one per line, temperature first) and its 2 footer lines
+def write_raw_file(file_path, board, algorithm, iteration, pairs):
+    header = ["MOSID synthetic acquisition", f"Board: {board}", f"Algorithm: {algorithm}", f"Iteration: {iteration}"]
+    footer = ["END OF ACQUISITION", f"Samples: {pairs.size}"]
+    with open(file_path, "w", newline='') as raw_file:
+        raw_file.write("\n".join(header) + "\n")
+        raw_file.write("\n".join(map(str, pairs.ravel().tolist())) + "\n")
+        raw_file.write("\n".join(footer) + "\n")
+
+# Function to generate the synthetic dataset, returning the (board, algorithm, iteration, path) tuples of the generated files
+def generate_dataset(output_directory, boards, algorithms, iterations, samples_per_algorithm, scale=1.0, seed=0, csv_directory=None):
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_directory, exist_ok=True)
+    calibration = generate_calibration(rng, boards)
+    write_table(os.path.join(output_directory, "Table_UIDS.csv"), calibration, rng)
+    board_profiles = {board: (rng.normal(0, 1.5), rng.normal(0, 0.01)) for board in calibration}
+    algorithm_loads = rng.uniform(0.3, 1.0, algorithms)
+    if csv_directory is not None:
+        os.makedirs(csv_directory, exist_ok=True)
+
+    generated_files = []
+    for board in range(1, boards + 1):
+        for algorithm in range(1, algorithms + 1):
+            folder = os.path.join(output_directory, f"{board}_{algorithm}")
+            os.makedirs(folder, exist_ok=True)
+            max_samples = int(samples_per_algorithm[algorithm - 1] * scale)
+            for iteration in range(1, iterations + 1):
+                # The real files hold a few samples more than the number used by the scripts.
+                num_pairs = max_samples // 2 + int(rng.integers(0, 50))
+                pairs = generate_pairs(rng, num_pairs, calibration[board], board_profiles[board], algorithm_loads[algorithm - 1])
+                file_path = os.path.join(folder, f"data_{iteration}.txt")
+                write_raw_file(file_path, board, algorithm, iteration, pairs)
+                generated_files.append((board, algorithm, iteration, file_path))
+
+                if csv_directory is not None:
+                    csv_block = convert_file_job((file_path, board, algorithm, iteration, max_samples, 1, 0, None, None, None, "stride", None))[0]
+                    with open(os.path.join(csv_directory, f"{board}_{algorithm}_{iteration}.csv"), mode='w', newline='') as csv_file:
+                        csv.writer(csv_file, delimiter=';').writerow(fields)
+                        csv_file.write(csv_block)
+    return generated_files
+
+
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+#///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+
+
+if __name__ == "__main__":
+    # The options of the configuration section can be replaced from the command line
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset with the structure of the MOSID dataset.")
+    parser.add_argument("--output", default=output_directory, help="folder of the synthetic 'X_Y' folders")
+    parser.add_argument("--csv", default=csv_directory, help="folder of the Multiple Files CSVs (not generated if not given)")
+    parser.add_argument("--boards", type=int, default=boards)
+    parser.add_argument("--algorithms", type=int, default=algorithms)
+    parser.add_argument("--iterations", type=int, default=iterations)
+    parser.add_argument("--scale", type=float, default=scale, help="fraction of the real number of samples of each file")
+    parser.add_argument("--seed", type=int, default=seed)
+    arguments = parser.parse_args()
+
+    generated_files = generate_dataset(arguments.output, arguments.boards, arguments.algorithms, arguments.iterations,
+                                       samples_per_algorithm, arguments.scale, arguments.seed, arguments.csv)
+    total_bytes = sum(os.path.getsize(file[3]) for file in generated_files)
+    print(f"{len(generated_files)} files ({total_bytes / 1024**2:.1f} MB) have been generated in '{arguments.output}'.")